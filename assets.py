@@ -0,0 +1,89 @@
+import time
+from config import *
+
+FONT_EXTENSIONS = ('.ttf', '.otf')
+SOUND_EXTENSIONS = ('.wav', '.mp3', '.ogg')
+
+
+class AssetManager:
+    """
+    Loads images, sounds and fonts by handle on first use and shares one copy of each. A handle is a
+    file path, or a (path, option) pair where the option is a font's size or an image's colorkey.
+    Holders that need an asset kept acquire it; trim drops the loaded assets nobody holds.
+    """
+    def __init__(self):
+        self.assets = {}        # Handle -> loaded asset
+        self.refs = {}          # Handle -> number of holders
+        self.preloaded = set()  # Handles held by preload
+        self.loads = 0
+        self.load_time = 0      # Seconds spent loading
+        self.hits = 0
+
+    def get(self, handle):
+        """
+        Returns the asset for the given handle, loading it if it is not loaded yet.
+        """
+        asset = self.assets.get(handle)
+        if asset is not None:
+            self.hits += 1
+            return asset
+        start = time.perf_counter()
+        asset = self.load(handle)
+        self.load_time += time.perf_counter() - start
+        self.loads += 1
+        self.assets[handle] = asset
+        return asset
+
+    @staticmethod
+    def load(handle):
+        """
+        Returns the asset loaded from the file the given handle names.
+        """
+        path, option = handle if isinstance(handle, tuple) else (handle, None)
+        extension = os.path.splitext(path)[1].lower()
+        if extension in FONT_EXTENSIONS:
+            return pygame.font.Font(path, option)
+        if extension in SOUND_EXTENSIONS:
+            return pygame.mixer.Sound(path)
+        image = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        if option is not None:
+            image.set_colorkey(option)
+        return image
+
+    def acquire(self, handle):
+        """
+        Returns the asset for the given handle and holds it until released.
+        """
+        self.refs[handle] = self.refs.get(handle, 0) + 1
+        return self.get(handle)
+
+    def release(self, handle):
+        """
+        Lets go of an asset held with acquire.
+        """
+        count = self.refs.get(handle, 0) - 1
+        if count > 0:
+            self.refs[handle] = count
+        else:
+            self.refs.pop(handle, None)
+
+    def preload(self, handles):
+        """
+        Loads every given asset now and holds it, so nothing in the list is loaded on first use.
+        Assets preloaded before are held only once.
+        """
+        for handle in handles:
+            if handle not in self.preloaded:
+                self.preloaded.add(handle)
+                self.acquire(handle)
+
+    def trim(self):
+        """
+        Drops the loaded assets that are not held, returning how many were dropped.
+        """
+        unused = [handle for handle in self.assets if handle not in self.refs]
+        for handle in unused:
+            del self.assets[handle]
+        return len(unused)
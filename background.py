@@ -0,0 +1,166 @@
+import random as rd
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+import rpyc
+from rpyc.core.vinegar import GenericException
+
+
+class BackgroundClient:
+    """
+    Fetches level backgrounds by keyword on a worker thread, so level changes never wait on the image
+    service. Backgrounds are kept in memory and on disk, and come from the local img/bg folders when
+    the service cannot be reached or fails. Cached and served backgrounds must already fit the window;
+    local ones are fitted to it here.
+    """
+    def __init__(self, host=IMAGE_HOST, port=IMAGE_PORT, timeout=IMAGE_TIMEOUT, cache_dir=BG_CACHE):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='background')
+        self.conn = None        # Connection to the image service, only used on the worker thread
+        self.images = {}        # Keyword -> decoded background
+        self.pending = {}       # Keyword -> future of its decoded background
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def request(self, keyword):
+        """
+        Starts fetching the background for the given keyword, unless it is cached or on its way.
+        """
+        if keyword in self.images:
+            self.hits += 1
+        elif keyword not in self.pending:
+            self.misses += 1
+            self.pending[keyword] = self.executor.submit(self.fetch, keyword)
+
+    def get(self, keyword):
+        """
+        Returns the background for the given keyword, or None if it has not arrived yet.
+        """
+        if keyword in self.images:
+            return self.images[keyword]
+        future = self.pending.get(keyword)
+        if future is None or not future.done():
+            return None
+        del self.pending[keyword]
+        image = future.result()
+        if image is not None:
+            self.images[keyword] = image
+        return image
+
+    def fetch(self, keyword):
+        """
+        Returns the decoded background for the given keyword from the disk cache, the image service or
+        the local folder, in that order. Cached files that cannot be used are dropped. Runs on the worker thread.
+        """
+        for source in (self.get_cached_path, self.get_service_path, self.get_local_path):
+            path = source(keyword)
+            if path is None:
+                continue
+            try:
+                image = pygame.image.load(path)
+            except (pygame.error, FileNotFoundError):
+                image = None
+            if image is None or (source != self.get_local_path and image.get_size() != (WIN_WIDTH, WIN_HEIGHT)):
+                self.failures += 1
+                if source == self.get_cached_path:
+                    self.discard(path)
+                continue
+            if source == self.get_local_path:
+                image = self.fit(image)
+            elif source == self.get_service_path:
+                self.store(keyword, path)
+            return image
+        return None
+
+    @staticmethod
+    def fit(image):
+        """
+        Returns the image scaled to cover the window and cropped to it, the way generate_bg prepares backgrounds.
+        """
+        width, height = image.get_size()
+        if (width, height) == (WIN_WIDTH, WIN_HEIGHT):
+            return image
+        scale = max(WIN_WIDTH / width, WIN_HEIGHT / height)
+        size = max(WIN_WIDTH, round(width * scale)), max(WIN_HEIGHT, round(height * scale))
+        resize = pygame.transform.smoothscale if image.get_bitsize() >= 24 else pygame.transform.scale
+        area = pygame.Rect((size[0] - WIN_WIDTH) // 2, (size[1] - WIN_HEIGHT) // 2, WIN_WIDTH, WIN_HEIGHT)
+        return resize(image, size).subsurface(area).copy()
+
+    def get_cached_path(self, keyword):
+        """
+        Returns the path of the background cached on disk for the given keyword, or None if there is none.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return None
+        for name in os.listdir(self.cache_dir):
+            if os.path.splitext(name)[0] == keyword:
+                return os.path.join(self.cache_dir, name)
+        return None
+
+    def get_service_path(self, keyword):
+        """
+        Returns the path of the image the service picked for the given keyword, or None if the service
+        cannot be reached in time or fails. The connection is kept open between requests.
+        """
+        try:
+            if self.conn is None or self.conn.closed:
+                self.conn = rpyc.connect(self.host, self.port, config={'sync_request_timeout': self.timeout})
+            return self.conn.root.exposed_get_image(keyword, IMAGE_PATH)
+        except (OSError, EOFError, TimeoutError, ValueError, GenericException):   # Service-side errors included
+            self.failures += 1
+            self.disconnect()
+            return None
+
+    @staticmethod
+    def get_local_path(keyword):
+        """
+        Returns the path of a random image from the local folder for the given keyword, or None if it has none.
+        """
+        folder = os.path.join(IMAGE_PATH, keyword)
+        if not os.path.isdir(folder):
+            return None
+        names = sorted(os.listdir(folder))
+        return os.path.join(folder, rd.choice(names)) if names else None
+
+    def store(self, keyword, path):
+        """
+        Copies a background from the service into the disk cache under its keyword.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            shutil.copyfile(path, os.path.join(self.cache_dir, keyword + os.path.splitext(path)[1]))
+        except OSError:
+            self.failures += 1
+
+    def discard(self, path):
+        """
+        Removes a file from the disk cache.
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            self.failures += 1
+
+    def disconnect(self):
+        """
+        Drops the connection to the image service.
+        """
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except (OSError, EOFError):
+                pass
+            self.conn = None
+
+    def close(self):
+        """
+        Stops the worker thread and closes the connection to the image service.
+        """
+        for future in self.pending.values():
+            future.cancel()
+        self.executor.submit(self.disconnect)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,29 @@
+from config import *
+
+
+class Camera:
+    """
+    Holds the world-to-screen offset applied when drawing. Sprites keep their world coordinates.
+    """
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+
+    def follow(self, sprite):
+        """
+        Centers the camera on the given sprite.
+        """
+        self.x = CENTER[0] - TILE_SIZE // 2 - sprite.rect.x
+        self.y = CENTER[1] - TILE_SIZE // 2 - sprite.rect.y
+
+    def apply(self, rect):
+        """
+        Returns the given world rect moved into screen space.
+        """
+        return rect.move(self.x, self.y)
+
+    def get_view(self):
+        """
+        Returns the area of the world currently visible on screen.
+        """
+        return pygame.Rect(-self.x, -self.y, WIN_WIDTH, WIN_HEIGHT)
@@ -0,0 +1,36 @@
+from config import *
+
+
+def tiles_under(rect):
+    """
+    Returns the (row, column) of every tile the rect touches.
+    """
+    return [(row, col)
+            for row in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1)
+            for col in range(rect.left // TILE_SIZE, (rect.right - 1) // TILE_SIZE + 1)]
+
+
+class PassabilityGrid:
+    """
+    Tile occupancy of a dungeon room, precomputed from its map data.
+    """
+    def __init__(self, node):
+        grid = node.get_data()
+        self.rows = grid.rows
+        self.columns = grid.columns
+        self.walkable = [bytearray(row.tobytes()) for row in ~grid.get_mask(BLOCKING_TILES)]
+
+    def is_walkable(self, row, col):
+        """
+        Returns true if the tile can be walked on, false otherwise.
+        """
+        return 0 <= row < self.rows and 0 <= col < self.columns and self.walkable[row][col] == 1
+
+    def is_blocked(self, rect):
+        """
+        Returns true if the rect touches any tile that cannot be walked on, false otherwise.
+        """
+        for row, col in tiles_under(rect):
+            if not self.is_walkable(row, col):
+                return True
+        return False
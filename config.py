@@ -1,7 +1,13 @@
+import os
 import pygame
-pygame.init()
 
-IMAGE_PATH = "C:\\Users\Colin\Desktop\Master Folder\Projects\Coding\CS361\dungeon-crawling-game\img\\bg"
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img', 'bg')
+IMAGE_HOST = 'localhost'
+IMAGE_PORT = 18861
+IMAGE_TIMEOUT = 2       # Seconds to wait on the image service
+BG_CACHE = 'cache/bg'   # Backgrounds kept from the image service, by keyword
+PREPARED_BG = 'cache/bg_prepared'  # Backgrounds the image service has scaled to the window
+PREFETCH_DISTANCE = 2  # Rooms ahead of a level change to start loading its background and song
 
 WIN_WIDTH = 672
 WIN_HEIGHT = 480
@@ -17,18 +23,30 @@ UP = 'U'
 DOWN = 'D'
 RIGHT = 'R'
 LEFT = 'L'
+DIRECTION_VECTORS = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+INTERACT = 'Z'
+USE_POWER = 'A'
 
 PLAYER_SPEED = 32
+POISON_TIME = 5000
+
+ROOM_SURFACE_CACHE = 4
+ROOM_GRID_CACHE = 8
+SPATIAL_CELL_SIZE = 4 * TILE_SIZE
+TEXT_CACHE_SIZE = 64
 
 FPS = 60
+TICK_MS = 1000 // FPS  # Logical milliseconds per frame
+KEYFRAME_INTERVAL = 60 * FPS  # Ticks between replay keyframes
 
 RED = (255, 0, 0)
 BLACK = (0, 0, 0)
 BLUE = (0, 0, 255)
 NASTY_GREEN = (181, 230, 29)
 
-LIFE = pygame.image.load('img/life.png')
-LIFE.set_colorkey(NASTY_GREEN)
+LIFE = ('img/life.png', NASTY_GREEN)
+SHOP_MENUS = [('img/shop_menu_1.png', NASTY_GREEN), ('img/shop_menu_2.png', NASTY_GREEN),
+              ('img/shop_menu_3.png', NASTY_GREEN)]
 
 PROG = [1, 25, 50, 75, 100, 101]
 REG = [-1, -1, 24, 49, 74, 99]
@@ -43,27 +61,35 @@ HUZZAH = 'sound/music/menu_old.mp3'
 MUSIC = ['sound/music/sunset.mp3', 'sound/music/funk.mp3', 'sound/music/wizard.mp3', 'sound/music/garden.mp3', OCEAN]
 
 
-CHANGE_OPTION = pygame.mixer.Sound('sound/effects/change_option.wav')
-SELECT = pygame.mixer.Sound('sound/effects/select.wav')
-WALL = pygame.mixer.Sound('sound/effects/wall.wav')
-EAT = pygame.mixer.Sound('sound/effects/bite.wav')
-DOOR = pygame.mixer.Sound('sound/effects/door3.wav')
-DAMAGE = pygame.mixer.Sound('sound/effects/damage.wav')
-GAME_OVER = pygame.mixer.Sound('sound/effects/game_over.wav')
-CLEAR = pygame.mixer.Sound('sound/effects/clear.wav')
-ERROR = pygame.mixer.Sound('sound/effects/error.wav')
-PURCHASE = pygame.mixer.Sound('sound/effects/purchase.wav')
-VICTORY = pygame.mixer.Sound('sound/effects/clear.wav')
-ZIPPERMOUTH = pygame.mixer.Sound('sound/effects/zippermouth.mp3')
-TRY_AGAIN = pygame.mixer.Sound('sound/effects/shopkeep.mp3')
-SAFE = pygame.mixer.Sound('sound/effects/safe.wav')
-
-TITLE_FONT = pygame.font.Font('font/PressStart2P-Regular.ttf', 36)
-TITLE_MENU_FONT = pygame.font.Font('font/PressStart2P-Regular.ttf', 22)
-SMALL_FONT = pygame.font.Font('font/PressStart2P-Regular.ttf', 16)
+CHANGE_OPTION = 'sound/effects/change_option.wav'
+SELECT = 'sound/effects/select.wav'
+WALL = 'sound/effects/wall.wav'
+EAT = 'sound/effects/bite.wav'
+DOOR = 'sound/effects/door3.wav'
+DAMAGE = 'sound/effects/damage.wav'
+GAME_OVER = 'sound/effects/game_over.wav'
+CLEAR = 'sound/effects/clear.wav'
+ERROR = 'sound/effects/error.wav'
+PURCHASE = 'sound/effects/purchase.wav'
+VICTORY = 'sound/effects/clear.wav'
+ZIPPERMOUTH = 'sound/effects/zippermouth.mp3'
+TRY_AGAIN = 'sound/effects/shopkeep.mp3'
+SAFE = 'sound/effects/safe.wav'
+
+TITLE_FONT = ('font/PressStart2P-Regular.ttf', 36)
+TITLE_MENU_FONT = ('font/PressStart2P-Regular.ttf', 22)
+SMALL_FONT = ('font/PressStart2P-Regular.ttf', 16)
+
+TITLE_ASSETS = [TITLE_FONT, TITLE_MENU_FONT, SMALL_FONT, CHANGE_OPTION, SELECT]     # Loaded before the title screen
+RUN_ASSETS = [LIFE, WALL, EAT, DOOR, DAMAGE, GAME_OVER, CLEAR, ERROR, PURCHASE, ZIPPERMOUTH, TRY_AGAIN,
+              SAFE]   # Loaded when a run starts
 
 WORLDS = ['desert', 'forest', 'ocean', 'mountain']
 ITEM_CODES = ['Ch', 'Ba', 'Me', 'Gr', 'Or', 'Ap']
+ENEMY_CODES = ['Ewb', 'Egl', 'Eww', 'Efe', 'Ezm', 'Egf']
+BLOCKING_TILES = ['B', 'S']
+SIGHT_RANGE = 5
+ROOM_BORDER = 12
 
 LV1_ENEMY = {0: 'Ezm', 5: 'Eww', 10: 'Efe', 50: 'Egl', 100: 'Ewb'}
 LV2_ENEMY = {10: 'Ezm', 20: 'Eww', 40: 'Efe', 70: 'Egl', 100: 'Ewb'}
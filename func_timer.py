@@ -7,8 +7,9 @@ def func_timer(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.perf_counter()
-        func(*args, **kwargs)
+        value = func(*args, **kwargs)
         end_time = time.perf_counter()
         elapsed_time = end_time - start_time
         print(elapsed_time)
+        return value
     return wrapper
@@ -1,24 +1,23 @@
 # Author: Colin Joss
 # Last date updated: 3/8/2022
 
-from sprites import *
-import level_generation as level
-import rpyc
+from simulation import *
+from renderer import RoomRenderer
+from camera import Camera
+from hud import HUD
+from text import TextRenderer
+from assets import AssetManager
+from background import BackgroundClient
+from prefetch import LevelPrefetcher
+from replay import Recorder
+import argparse
 
-
-def sequence():
-    """
-    Generator function. Returns next number in incremental sequence, starting with 0.
-    """
-    n = 0
-    while True:
-        yield n
-        n += 1
+KEYS = {LEFT: pygame.K_LEFT, RIGHT: pygame.K_RIGHT, DOWN: pygame.K_DOWN, UP: pygame.K_UP}
 
 
-class Game:
+class Game(Simulation):
     """
-    Class representing the game.
+    Class representing the game: the pygame front end over the simulation.
     """
     def __init__(self):
 
@@ -27,314 +26,186 @@ class Game:
         self.screen = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
         self.clock = pygame.time.Clock()
         self.running = True
-        self.playing = False
-        self.player = None
         self.bg = None
-        self.loc = None
-        self.friend_eater = None
-        self.shop = None
-        self.door_count = sequence()
-        self.room_count = sequence()
-
-        # Sprite sheets
-        self.character_sheet = SpriteSheet('img/player_sheet.png')
-        self.enemy_sheet = SpriteSheet('img/enemy_sheet.png')
-        self.npc_sheet = SpriteSheet('img/npc_sheet.png')
-        self.terrain_sheet = SpriteSheet('img/terrain_sheet.png')
-        self.door_sheet = SpriteSheet('img/door_sheet.png')
-        self.items_sheet = SpriteSheet('img/items_sheet.png')
-        self.all_sprites = pygame.sprite.LayeredUpdates()
-        self.all_items = pygame.sprite.LayeredUpdates()
-        self.all_doors = pygame.sprite.LayeredUpdates()
-        self.all_enemies = pygame.sprite.LayeredUpdates()
-        self.blocks = pygame.sprite.LayeredUpdates()
-        self.doors = pygame.sprite.LayeredUpdates()
-        self.enemies = pygame.sprite.LayeredUpdates()
-        self.attacks = pygame.sprite.LayeredUpdates()
-        self.ground = pygame.sprite.LayeredUpdates()
-
-        # Counts and tallies
-        self.current_lives = 1
-        self.total_lives = 1
-        self.fruit_count = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0, 9: 0}
-        self.power_up = 0
-        self.visited = [0]
-        self.unvisited = 0
-        self.depth = 0
-        self.level = 0
-        self.paths = 0
-        self.unopened_doors = []
-        self.locked_doors = []
-        self.current_room = None
-        self.home = False
-        self.sprite_key = {'B': Block,
-                           'S': ShopKeep,
-                           'Ewb': WaddleBug,
-                           'Egl': GrimLeaper,
-                           'Eww': WaitWatch,
-                           'Egf': None,
-                           'Ezm': ZipperMouth,
-                           'Ch': Cherry,
-                           'Ba': Banana,
-                           'Me': Melon,
-                           'Gr': Grape,
-                           'Or': Orange,
-                           'Ap': Apple
-                           }
-
-    def set_bg(self, new_bg):
-        """
-        Sets the background to the given image.
-        """
-        self.bg = pygame.image.load(new_bg)
-
-    def set_current_location(self, new_loc):
-        """
-        Sets the player location to the given mapnode.
-        """
-        self.loc = new_loc
-
-    def increment_level(self):
-        """
-        Increments the game level by 1.
-        """
-        self.level += 1
-
-    def decrement_level(self):
-        """
-        Decrements the game level by 1.
-        """
-        self.level -= 1
-
-    def increment_depth(self):
-        """
-        Increments the depth (how many rooms deep the player is) by 1.
-        """
-        self.depth += 1
-
-    def decrement_depth(self):
-        """
-        Decrements the depth (how many rooms deep the player is) by 1.
-        """
-        self.depth -= 1
+        self.bg_keyword = None  # Background requested but not yet arrived
+        super().__init__()
 
-    def increment_paths(self):
-        """
-        Increments the number of open paths by 1.
-        """
-        self.paths += 1
+        # Presentation
+        self.sheets = {sheet.name: sheet for sheet in self.sprite_sheets}
+        self.assets = AssetManager()
+        self.assets.preload(TITLE_ASSETS)
+        self.title_text = TextRenderer(self.assets.get(TITLE_FONT))
+        self.menu_text = TextRenderer(self.assets.get(TITLE_MENU_FONT))
+        self.small_text = TextRenderer(self.assets.get(SMALL_FONT))
+        self.renderer = RoomRenderer(self)
+        self.camera = Camera()
+        self.hud = HUD(self)
+        self.backgrounds = BackgroundClient()
+        self.prefetcher = LevelPrefetcher(self.backgrounds)
+        self.song_file = None   # In-memory song playing, kept alive for the mixer
 
-    def decrement_paths(self):
-        """
-        Decrements the number of opened paths by 1.
-        """
-        self.paths -= 1
+        # Debug counters
+        self.debug = False
+        self.sprites_drawn = 0
+        self.sprites_culled = 0
 
-    def increment_fruit_count(self, key):
+    def load_sheet(self, sheet):
         """
-        Increments the count of a fruit.
+        Returns the sprite sheet loaded from the given image.
         """
-        self.fruit_count[key] += 1
+        return SpriteSheet(sheet)
 
-    def increment_current_lives(self):
+    def get_frame(self, key):
         """
-        Increments the number of lives the player has currently.
+        Returns the surface for the given frame key.
         """
-        self.current_lives += 1
+        return self.sheets[key[0]].get_frame(*key[1:])
 
-    def increment_total_lives(self):
+    def pause(self, ms):
         """
-        Increments the number of lives the player has at the start of a new game.
+        Holds the current frame on screen for a moment.
         """
-        self.total_lives += 1
+        pygame.time.delay(ms)
+        super().pause(ms)
 
-    def decrement_current_lives(self):
+    def clear_screen(self):
         """
-        Decrements the number of lives the player has currently.
+        Blanks the screen between rooms.
         """
-        self.current_lives -= 1
+        self.screen.fill(BLACK)
 
-    def add_to_visited(self, door):
+    def stop_music(self):
         """
-        Adds a door number to the visited array.
+        Stops the current song.
         """
-        self.visited.append(door)
+        pygame.mixer.music.stop()
 
-    def reset(self):
+    def reset(self, seed=None):
         """
         Resets key variables for a new game.
         """
-        self.player = None
-        self.current_lives = self.total_lives
-        self.visited = [0]
-        self.unvisited = 0
-        self.depth = 0
-        self.level = 0
-        self.paths = 0
-        self.unopened_doors = []
-        self.locked_doors = []
-        self.home = True
-        self.door_count = sequence()
-        self.room_count = sequence()
-        self.friend_eater = None
-        self.current_room = None
+        super().reset(seed)
+        self.assets.preload(RUN_ASSETS)
         self.bg = None
-        self.loc = None
-        self.shop = None
-        self.power_up = False
-
-    def start(self):
-        """
-        Starts new game by creating new map tree and initial maps.
-        """
-        tree = level.start_tree()
-        node, player = level.generate_starting_maps(self)
-        tree.set_head(node)
-        self.load_room(tree.head, player)
+        self.bg_keyword = None
 
     def load_room(self, room, player):
         """
-        Loads the current dungeon room.
+        Loads the current dungeon room and prefetches the assets of any level change it is near.
         """
-        self.friend_eater = None
-        self.set_current_location(room)  # Set incoming as current location
-        room.data[player[0] + 1][player[1]] = 'P'  # Place player spawn in room data
-        self.build_map(room)  # Translate map data to sprites
-        room.data[player[0] + 1][player[1]] = '.'  # Remove player spawn
-        self.center_camera(player)  # Center camera on player
-        self.player.invulnerable = True
-        self.player.invulnerability_timer = pygame.time.get_ticks() + 1000
+        super().load_room(room, player)
+        self.prefetcher.update(self.depth, self.level)
 
-    def build_map(self, node):
+    def build_map(self, node, player):
         """
-        Loop through map data and create corresponding sprites.
+        Bakes the room's ground and walls, then creates its sprites.
         """
-        for y, row in enumerate(node.get_data()):
-            for x, col in enumerate(row):
-                Ground(self, x, y)
-                if isinstance(col, int):  # If number, create door
-                    self.place_door(col, x, y)
-                elif col == '.':
-                    continue
-                elif col == 'P':  # If P, create player
-                    self.player = Player(self, x, y)
-                elif col == 'Efe':
-                    self.friend_eater = FriendEater(self, x, y)
-                else:  # Otherwise create sprite via sprite key
-                    self.sprite_key[col](self, x, y)
+        self.renderer.load(node)
+        super().build_map(node, player)
 
-    def place_door(self, col, x, y):
+    def load_state(self, data):
         """
-        Create door sprite.
+        Returns the world to a saved state, baking its room, redrawing the HUD and putting up the
+        level's background and song.
         """
-        if col in self.locked_doors:  # Locked door
-            Door(self, x, y, col, True, True)
-        elif col in self.unopened_doors:  # Unlocked unopened door
-            Door(self, x, y, col, False, True)
-        else:  # Unlocked opened door
-            Door(self, x, y, col, False, False)
+        super().load_state(data)
+        self.renderer.surfaces.clear()
+        self.renderer.load(self.loc)
+        self.hud.version = None
+        if self.level == 0:
+            self.set_bg(HOME)
+            self.play_song(OCEAN)
+        else:
+            self.request_bg(BACKGROUND[self.level - 1])
+            self.play_song(MUSIC[self.level - 1])
 
-    def center_camera(self, player):
+    def set_bg(self, new_bg):
         """
-        Centers game camera on player spawn point.
+        Sets the background to the given image.
         """
-        for sprite in self.all_sprites:
-            sprite.rect.x -= player[1] * TILE_SIZE
-            sprite.rect.x += 10 * TILE_SIZE
-            sprite.rect.y -= player[0] * TILE_SIZE
-            sprite.rect.y += 6 * TILE_SIZE
+        self.bg = pygame.image.load(new_bg).convert()
 
     def keyboard_events(self):
         """
-        Handles non-movement keyboard events.
+        Handles keyboard events, collecting the held directions and actions for the next tick.
         """
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.playing = False
                 self.running = False
 
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_z]:
-                self.player.check_facing_tile()
-            if keys[pygame.K_a] and self.power_up != 0:
-                self.player.use_power()
-
-    def kill_map(self):
-        """
-        Kills all currently existing sprites.
-        """
-        for sprite in self.all_sprites:
-            sprite.kill()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.debug = not self.debug
 
-    def update(self):
-        """
-        The game's core update function.
-        """
-        if self.is_victory():
-            return self.victory()
-        self.update_level()
-        if self.is_room_clear():
-            self.unlock_all_doors()
-            self.kill_all_enemies()
-        self.all_sprites.update()
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_z] and INTERACT not in self.actions:
+                self.actions.append(INTERACT)
+            if keys[pygame.K_a] and USE_POWER not in self.actions:
+                self.actions.append(USE_POWER)
 
-    def is_room_clear(self):
-        """
-        Returns true if the room is clear, false otherwise.
-        """
-        return self.loc.is_empty_fruit() and not self.loc.is_clear()
+        keys = pygame.key.get_pressed()
+        self.held = {direction for direction, key in KEYS.items() if keys[key]}
 
-    def is_victory(self):
-        """
-        Returns true if the game is won, false otherwise.
-        """
-        if self.depth == 101:
-            return True
-        return False
-
-    def unlock_all_doors(self):
+    def draw(self):
         """
-        Loops through all door sprites and makes them unlocked.
+        Draws sprites to the screen.
         """
-        for door in self.all_doors:
-            door.unlock()
+        self.camera.follow(self.player)
+        self.update_bg()
+        if self.bg is None:     # Background still on its way
+            self.screen.fill(BLACK)
+        else:
+            self.screen.blit(self.bg, (0, 0))
+        self.renderer.draw(self.screen, self.camera)
+        self.draw_poison()
+        self.draw_sprites()
+        self.hud.draw(self.screen)
+        if self.debug:
+            self.blit_debug()
+        self.clock.tick(FPS)
+        pygame.display.update()
 
-    def kill_all_enemies(self):
+    def draw_poison(self):
         """
-        Loops through all enemy sprites and removes them.
+        Draws the poisoned tiles inside the camera view as an overlay on the room.
         """
-        for enemy in self.all_enemies:
-            enemy.defeat()
-        pygame.time.wait(150)
+        view = self.camera.get_view()
+        image = self.terrain_sheet.get_frame(32, 0, TILE_SIZE, TILE_SIZE)
+        for row, col in self.poison.tiles:
+            tile = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            if view.colliderect(tile):
+                self.screen.blit(image, self.camera.apply(tile))
 
-    def draw(self):
+    def draw_sprites(self):
         """
-        Draws sprites to the screen.
+        Draws only the sprites inside the camera view.
         """
-        self.screen.blit(self.bg, (0, 0))
-        self.all_sprites.draw(self.screen)
-        self.blit_lives()
-        self.blit_fruit_count()
-        self.blit_powers()
-        self.clock.tick(FPS)
-        pygame.display.update()
+        visible = self.all_sprites.query(self.camera.get_view())
+        self.sprites_drawn = len(visible)
+        self.sprites_culled = len(self.all_sprites) - len(visible)
+        self.screen.blits([(self.get_frame(sprite.image), self.camera.apply(sprite.rect)) for sprite in visible],
+                         doreturn=False)
 
-    def update_level(self):
+    def blit_debug(self):
         """
-        Changes level background and music by player depth.
+        Displays performance counters in the bottom right corner.
         """
-        if self.home:  # Home room
-            pygame.mixer.music.stop()
-            self.intro_text()
-            self.set_bg(HOME)
-            self.play_song(OCEAN)
-            self.home = False
-        elif self.depth == 1 and self.level == 0:  # First room
-            self.new_level()
-        elif self.depth == PROG[self.level]:  # New level
-            self.new_level()
-        elif self.depth == REG[self.level]:  # Old level
-            self.old_level()
+        lines = ['DRAWN ' + str(self.sprites_drawn), 'CULLED ' + str(self.sprites_culled),
+                 'UPDATES ' + str(self.update_calls),
+                 'PATH BUILDS ' + str(self.flow_field.builds),
+                 'PREGEN HITS ' + str(self.pregenerator.hits), 'PREGEN MISSES ' + str(self.pregenerator.misses),
+                 'BG HITS ' + str(self.backgrounds.hits), 'BG MISSES ' + str(self.backgrounds.misses),
+                 'PREFETCH HITS ' + str(self.prefetcher.hits), 'PREFETCH MISSES ' + str(self.prefetcher.misses),
+                 'HUD RENDERS ' + str(self.hud.renders),
+                 'TEXT MISSES ' + str(sum(text.misses for text in (self.title_text, self.menu_text, self.small_text))),
+                 'FRAME HITS ' + str(sum(sheet.hits for sheet in self.sprite_sheets)),
+                 'FRAME MISSES ' + str(sum(sheet.misses for sheet in self.sprite_sheets)),
+                 'ASSET LOADS {} ({:.0f} MS)'.format(self.assets.loads, self.assets.load_time * 1000)]
+        y = WIN_HEIGHT - 20 * len(lines)
+        for line in lines:
+            t = self.small_text.render(line, 'white')
+            self.screen.blit(t, (WIN_WIDTH - t.get_width() - 4, y))
+            y += 20
 
     def intro_text(self):
         """
@@ -349,90 +220,30 @@ class Game:
             self.blit_small_text('this heavy sky..."', 'white', (336, 280))
             pygame.display.update()
 
-    def new_level(self):
-        """
-        Changes the background and music to a new level.
-        """
-        self.request_bg(BACKGROUND[self.level])
-        self.play_song(MUSIC[self.level])
-        self.increment_level()
-
-    def old_level(self):
-        """
-        Changes the background and music to an old level.
-        """
-        self.request_bg(BACKGROUND[self.level - 2])
-        self.play_song(MUSIC[self.level - 2])
-        self.decrement_level()
-
-    def blit_lives(self):
-        """
-        Displays player lives in top left corner.
-        """
-        x = 0
-        for life in range(0, self.current_lives):
-            self.screen.blit(LIFE, (x, 0))
-            x += TILE_SIZE
-
-    def blit_fruit_count(self):
-        """
-        Displays player fruit count in top of screen.
-        """
-        # Blit fruit sprites to top left
-        sprite_x, screen_x = 0, 182
-        for fruit in range(0, 6):
-            self.screen.blit(self.items_sheet.get_sprite(sprite_x, 0, 32, 32), (screen_x, 0))
-            sprite_x += TILE_SIZE
-            screen_x += 80
-
-        # Blit fruit counts to top left
-        screen_x = 214
-        for i in range(0, 6):
-            count = self.fruit_count[i]
-            ones, tens, hunds = count % 10, (count // 10) % 10, count // 100
-            t = SMALL_FONT.render(str(hunds) + str(tens) + str(ones), True, 'white')
-            t_rect = t.get_rect()
-            t_rect.center = (screen_x, 0)
-            self.screen.blit(t, (screen_x, 9))
-            screen_x += 80
-
-    def blit_powers(self):
-        """
-        Displays player lives in top left corner.
-        """
-        if self.power_up != 0:
-            self.screen.blit(self.items_sheet.get_sprite(self.power_up * 32, 0, 32, 32), (0, 448))
-
     def main(self):
         """
         Main game loop.
         """
         while self.playing:
             self.keyboard_events()
-            self.update()
+            self.step()
             self.draw()
 
     def game_over(self):
         """
         Displays game over screen and ends main game loop.
         """
-        title = TITLE_FONT.render('GAME OVER', True, 'RED')
-        title_rect = title.get_rect()
-        title_rect.center = (336, 150)
         self.screen.fill((0, 0, 0))
-        self.screen.blit(title, title_rect)
+        self.blit_big_text('GAME OVER', 'RED', (336, 150))
         pygame.display.update()
         pygame.mixer.music.stop()
-        pygame.mixer.Sound.play(GAME_OVER)
+        self.play_sound(GAME_OVER)
         pygame.time.delay(2000)
         self.playing = False
 
     def victory(self):
-        title = TITLE_FONT.render('CONGRATULATIONS!', True, 'BLUE')
-        title_rect = title.get_rect()
-        title_rect.center = (336, 150)
         self.screen.fill((0, 0, 0))
-        self.screen.blit(title, title_rect)
+        self.blit_big_text('CONGRATULATIONS!', 'BLUE', (336, 150))
         pygame.display.update()
         pygame.mixer.music.stop()
         self.play_song(HUZZAH)
@@ -493,43 +304,50 @@ class Game:
         """
         Displays large text to the screen.
         """
-        big_text = TITLE_FONT.render(text, True, color)
-        big_text_rect = big_text.get_rect()
-        big_text_rect.center = pos
-        self.screen.blit(big_text, big_text_rect)
+        self.title_text.blit(self.screen, text, color, pos)
 
     def blit_small_text(self, text, color, pos):
         """
         Displays small text to the screen.
         """
-        small_text = TITLE_MENU_FONT.render(text, True, color)
-        small_text_rect = small_text.get_rect()
-        small_text_rect.center = pos
-        self.screen.blit(small_text, small_text_rect)
+        self.menu_text.blit(self.screen, text, color, pos)
 
-    @staticmethod
-    def play_song(song):
+    def play_song(self, song):
         """
-        Plays given song indefinitely.
+        Plays given song indefinitely, from memory if it was prefetched.
         """
-        pygame.mixer.music.load(song)
+        self.song_file = self.prefetcher.get_song(song)
+        if self.song_file is not None:
+            pygame.mixer.music.load(self.song_file, os.path.splitext(song)[1][1:])
+        else:
+            pygame.mixer.music.load(song)
         pygame.mixer.music.play(-1)
 
-    @staticmethod
-    def play_sound(effect):
+    def play_sound(self, effect):
         """
         Plays given sound effect once.
         """
-        pygame.mixer.Sound.play(effect)
+        self.assets.get(effect).play()
 
     def request_bg(self, keyword):
         """
-        Opens a connection with image microservice and retrieves image matching given keyword.
+        Asks for the background matching the given keyword. The current one stays up until it arrives.
+        """
+        self.backgrounds.request(keyword)
+        self.bg_keyword = keyword
+
+    def update_bg(self):
+        """
+        Puts up the requested background once it has arrived.
         """
-        conn = rpyc.connect("localhost", 18861)
-        image = conn.root.exposed_get_image(keyword, IMAGE_PATH)
-        self.set_bg(image)
-        conn.close()
+        if self.bg_keyword is None:
+            return
+        image = self.backgrounds.get(self.bg_keyword)
+        if image is not None:
+            self.bg = image.convert()
+            self.bg_keyword = None
+        elif self.bg_keyword not in self.backgrounds.pending:    # Found nowhere, keep the current one
+            self.bg_keyword = None
 
     def instructions_screen(self):
         """
@@ -583,58 +401,28 @@ class Game:
         self.blit_small_text('ARROW KEYS TO MOVE', 'blue', (336, 400))
         self.blit_small_text('PRESS ESC TO RETURN TO MENU', 'red', (336, 440))
 
-    def player_death(self):
-        """
-        Subtract life and respawn player, else end game.
-        """
-        self.decrement_current_lives()
-        self.kill_map()
-        self.screen.fill(BLACK)
-        if self.current_lives == 0:
-            self.game_over()
-        else:
-            self.player.invulnerable = True
-            self.player.invulnerability_timer = pygame.time.get_ticks() + 1000
-            self.load_room(self.loc, (len(self.loc.get_data()) // 2, len(self.loc.get_data()[0]) // 2))
-
-    def traverse(self, door):
-        """
-        Travel into a new dungeon room.
-        """
-        self.player.rel_x, self.player.rel_y = 0, 0
-        self.kill_map()
-        self.screen.fill(BLACK)
-        node = self.loc.bridges[door].get_node()  # Get target room
-        self.update_depth(node)
-        self.play_sound(DOOR)
-        player = self.loc.bridges[door].get_spawn()  # Get player spawn coordinate
-        self.player.movement_delay = pygame.time.get_ticks() + 2000
-        self.shop = None
-        self.load_room(node, player)
-
-    def update_depth(self, node):
-        """
-        Update player depth
-        """
-        if node.num not in self.visited:  # New depth
-            self.depth += 1
-            node = level.generate_next_maps(self, node)
-            self.add_to_visited(node.num)
-        elif node.num in self.visited and self.loc.get_num() < node.get_num():  # Depth reachieved
-            self.increment_depth()
-        else:  # Backtracking
-            self.decrement_depth()
-
     def open_shop(self):
         """
         Returns a new shop object.
         """
         return GameShop(self)
 
+    def close_shop(self):
+        """
+        Lets go of the current room's shop and its menus.
+        """
+        if self.shop is not None:
+            for menu in SHOP_MENUS:
+                self.assets.release(menu)
+        super().close_shop()
+
     def trade(self):
         """
-        Opens the shop menu for the user.
+        Opens the shop menu for the user, or makes the recorded purchases when replaying.
         """
+        if self.replaying:
+            super().trade()
+            return
         self.shop.open = True
         self.shop.menu()
 
@@ -643,12 +431,7 @@ class GameShop:
     def __init__(self, game):
         self.game = game
 
-        self.menu_1 = pygame.image.load('img/shop_menu_1.png')
-        self.menu_1.set_colorkey(NASTY_GREEN)
-        self.menu_2 = pygame.image.load('img/shop_menu_2.png')
-        self.menu_2.set_colorkey(NASTY_GREEN)
-        self.menu_3 = pygame.image.load('img/shop_menu_3.png')
-        self.menu_3.set_colorkey(NASTY_GREEN)
+        self.menu_1, self.menu_2, self.menu_3 = (game.assets.acquire(menu) for menu in SHOP_MENUS)
 
         self.ware_count = 0
         self.trade_1 = self.restock()
@@ -691,10 +474,7 @@ class GameShop:
         Blits the current trade prices to the shop menu.
         """
         ones, tens, hunds = price % 10, (price // 10) % 10, price // 100
-        t = SMALL_FONT.render(str(hunds) + str(tens) + str(ones), True, 'white')
-        t_rect = t.get_rect()
-        t_rect.center = pos
-        self.game.screen.blit(t, pos)
+        self.game.small_text.blit(self.game.screen, str(hunds) + str(tens) + str(ones), 'white', pos, center=False)
 
     def scroll_shop_menu(self, event, active_menu):
         """
@@ -726,15 +506,9 @@ class GameShop:
         elif selected == self.menu_3:
             trade = self.trade_3
 
-        if self.game.fruit_count[trade.cost_code] >= trade.cost_count and self.game.power_up == 0:
-            self.game.fruit_count[trade.cost_code] -= trade.cost_count
-            self.game.fruit_count[trade.cost_code] += 1
-            self.game.power_up = trade.ret_code
-            self.game.blit_fruit_count()
+        if self.game.buy(trade.cost_code, trade.cost_count, trade.ret_code):
+            self.game.hud.draw(self.game.screen)
             self.game.play_sound(PURCHASE)
-        if self.game.fruit_count[6] == 4:
-            self.game.fruit_count[6] = 0
-            self.game.increment_lives()
 
     def restock(self):
         """
@@ -786,10 +560,8 @@ class GameShopTrade:
         self.active = True
 
     def set_images(self):
-        self.cost_image = self.game.items_sheet.get_sprite(self.cost_code * 32, 0, 32, 32)
-        self.cost_image.set_colorkey(NASTY_GREEN)
-        self.ret_image = self.game.items_sheet.get_sprite(self.ret_code * 32, 0, 32, 32)
-        self.ret_image.set_colorkey(NASTY_GREEN)
+        self.cost_image = self.game.items_sheet.get_frame(self.cost_code * 32, 0, 32, 32)
+        self.ret_image = self.game.items_sheet.get_frame(self.ret_code * 32, 0, 32, 32)
 
     def set_counts(self):
         if self.ret_code == 6:
@@ -800,11 +572,23 @@ class GameShopTrade:
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play Heavy Sky.')
+    parser.add_argument('--record', metavar='LOG', help='record each run to this replay log')
+    args = parser.parse_args()
+
     game = Game()
     while game.running:
         game.title_screen()
         if game.playing is True:
             game.reset()
+            if args.record:
+                game.recorder = Recorder(game)
             game.start()
         while game.playing:
             game.main()
+        if game.recorder is not None:
+            game.recorder.save(args.record, game)
+            game.recorder = None
+        game.assets.trim()  # Back to the title screen, drop what only the run used
+    game.prefetcher.close()
+    game.backgrounds.close()
@@ -1,28 +1,133 @@
-from PIL import Image
+"""
+Prepares every background under img/bg for the game: each image is scaled and cropped to the window and
+saved as BMP under PREPARED_BG, mirroring the folders of its source. A manifest of content hashes lets
+later runs prepare only the images that were added or changed, and drop those that were removed.
+
+Usage: python generate_bg.py [--force] [--workers WORKERS]
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
 from func_timer import func_timer
+from config import WIN_WIDTH, WIN_HEIGHT, IMAGE_PATH, PREPARED_BG
+
+IMAGE_EXTENSIONS = ('.bmp', '.jpg', '.jpeg', '.png')
+MANIFEST = 'manifest.json'
+
+
+def prepare_background(source, target, size=(WIN_WIDTH, WIN_HEIGHT)):
+    """
+    Scales an image to cover the window, crops it to the window and saves it as BMP, which pygame
+    loads without decoding.
+    """
+    with Image.open(source) as image:
+        prepared = ImageOps.fit(image.convert('RGB'), size, Image.LANCZOS)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    prepared.save(target, format='BMP')
+
+
+def get_prepared_name(name):
+    """
+    Returns the path, relative to the prepared folder, of the prepared copy of a source image.
+    """
+    return os.path.splitext(name)[0] + '.bmp'
+
+
+def hash_file(path):
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_sources(source_dir):
+    """
+    Returns the paths of all images under the source folder, relative to it, in sorted order.
+    """
+    names = []
+    for folder, subfolders, files in os.walk(source_dir):
+        subfolders.sort()
+        for file in sorted(files):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                names.append(os.path.relpath(os.path.join(folder, file), source_dir))
+    return names
+
+
+def load_manifest(prepared_dir):
+    """
+    Returns the manifest of the prepared folder, mapping source names to their hashes.
+    """
+    try:
+        with open(os.path.join(prepared_dir, MANIFEST)) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(prepared_dir, manifest):
+    """
+    Writes the manifest of the prepared folder.
+    """
+    os.makedirs(prepared_dir, exist_ok=True)
+    path = os.path.join(prepared_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def prepare_all(source_dir=IMAGE_PATH, prepared_dir=PREPARED_BG, force=False, workers=None):
+    """
+    Prepares the images under the source folder whose contents changed since the last run, or all of
+    them if forced, and removes the prepared copies of images that are gone. Returns the number of
+    images prepared, kept and removed.
+    """
+    old = load_manifest(prepared_dir)
+    new = {name: hash_file(os.path.join(source_dir, name)) for name in find_sources(source_dir)}
+    changed = [name for name in new
+               if force or old.get(name) != new[name]
+               or not os.path.exists(os.path.join(prepared_dir, get_prepared_name(name)))]
+    removed = [name for name in old if name not in new]
+    kept = len(new) - len(changed)
+
+    with ProcessPoolExecutor(workers) as executor:
+        jobs = [executor.submit(prepare_background, os.path.join(source_dir, name),
+                                os.path.join(prepared_dir, get_prepared_name(name)))
+                for name in changed]
+        for name, job in zip(changed, jobs):
+            try:
+                job.result()
+            except Exception as error:     # Any broken source is left out, not just unreadable files
+                print('Could not prepare {}: {}'.format(name, error))
+                del new[name]
+    for name in removed:
+        target = os.path.join(prepared_dir, get_prepared_name(name))
+        if os.path.exists(target):
+            os.remove(target)
+        folder = os.path.dirname(target)
+        if os.path.normpath(folder) != os.path.normpath(prepared_dir) and len(os.listdir(folder)) == 0:
+            os.rmdir(folder)
+
+    save_manifest(prepared_dir, new)
+    return len(new) - kept, kept, len(removed)
 
 
 @func_timer
-def work():
-    f1 = 'img/ocean600.png'
-    bg = Image.open(f1, 'r')
-    bg.save("img/ocean600-1.png", format='png')
-    bg.close()
-
-# if self.x_change > 0:
-#     for sprite in self.game.all_sprites:
-#         sprite.rect.x += PLAYER_SPEED
-#     self.rect.x = hits[0].rect.left - self.rect.width
-# if self.x_change < 0:
-#     for sprite in self.game.all_sprites:
-#         sprite.rect.x -= PLAYER_SPEED
-#     self.rect.x = hits[0].rect.right
-
-# if self.y_change > 0:
-#     for sprite in self.game.all_sprites:
-#         sprite.rect.y += PLAYER_SPEED
-#     self.rect.y = hits[0].rect.top - self.rect.height
-# if self.y_change < 0:
-#     for sprite in self.game.all_sprites:
-#         sprite.rect.y -= PLAYER_SPEED
-#     self.rect.y = hits[0].rect.bottom
+def main():
+    parser = argparse.ArgumentParser(description='Prepare background images for the game.')
+    parser.add_argument('--force', action='store_true', help='prepare every image, changed or not')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    prepared, kept, removed = prepare_all(force=args.force, workers=args.workers)
+    print('Prepared {}, unchanged {}, removed {}'.format(prepared, kept, removed))
+
+
+if __name__ == '__main__':
+    main()
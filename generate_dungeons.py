@@ -0,0 +1,133 @@
+"""
+Generates complete dungeons without a game window and reports statistics about them.
+
+Usage: python generate_dungeons.py [-n COUNT] [--seed SEED] [--workers WORKERS]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from collections import Counter
+from config import *
+from room_grid import RoomCache
+from simulation import Simulation
+import level_generation as level
+
+FINAL_DEPTH = 99    # Depth whose doors all lead to the end room
+
+
+def explore(seed):
+    """
+    Generates a dungeon from the seed by walking it depth first, entering every door the way
+    a player would, until the rooms at the final depth are generated. Returns its statistics.
+    """
+    dungeon = Simulation()
+    dungeon.room_cache = RoomCache(0)   # Grids are only built to count fruit
+    context = level.GenerationContext(dungeon, dungeon.depth, seed)
+    head, spawn = level.generate_starting_maps(context)
+    context.apply(dungeon)
+
+    rooms, dead_ends, treasure = [head], 0, 0
+    doors = Counter()   # Dead end probability -> doors generated under it
+    deaths = Counter()  # Dead end probability -> dead ends among those doors
+    visited = {head}
+    stack = [head]
+    while stack:
+        unvisited = [bridge.get_node() for bridge in stack[-1].get_bridges().values()
+                     if isinstance(bridge, level.BridgeNode) and bridge.get_node() not in visited]
+        if len(unvisited) == 0:     # Backtrack
+            stack.pop()
+            dungeon.decrement_depth()
+            dungeon.update_level()
+            continue
+
+        node = unvisited[0]
+        visited.add(node)
+        stack.append(node)
+        dungeon.increment_depth()
+        context = level.GenerationContext(dungeon, dungeon.depth, node.seed)
+        context.decrement_paths()   # Entered path closes first, as in generate_next_maps
+        probability = level.get_dead_end_probability(context)
+        context.increment_paths()
+        level.generate_next_maps(context, node)
+        context.apply(dungeon)
+
+        children = [bridge.get_node() for key, bridge in node.get_bridges().items()
+                    if isinstance(bridge, level.BridgeNode) and bridge.get_node() not in visited]
+        rooms.extend(children)
+        if dungeon.depth < FINAL_DEPTH:
+            doors[probability] += len(children)
+            for child in children:
+                if len(child.get_bridges()) == 1:   # Dead ends have only the door back
+                    dead_ends += 1
+                    deaths[probability] += 1
+                    treasure += child.treasure
+        if dungeon.depth == FINAL_DEPTH:
+            break
+        dungeon.update_level()
+
+    return {
+        'rooms': len(rooms),
+        'sizes': Counter((node.dimensions[0] - 2 * ROOM_BORDER, node.dimensions[1] - 2 * ROOM_BORDER)
+                         for node in rooms if len(node.get_bridges()) > 1),
+        'dead_ends': dead_ends,
+        'treasure': treasure,
+        'doors': doors,
+        'deaths': deaths,
+    }
+
+
+def report(results, elapsed):
+    """
+    Prints the combined statistics of the generated dungeons.
+    """
+    rooms = sorted(result['rooms'] for result in results)
+    sizes, doors, deaths = Counter(), Counter(), Counter()
+    for result in results:
+        sizes.update(result['sizes'])
+        doors.update(result['doors'])
+        deaths.update(result['deaths'])
+    dead_ends = sum(result['dead_ends'] for result in results)
+    treasure = sum(result['treasure'] for result in results)
+
+    print('Dungeons: {} in {:.2f}s ({:.1f}/s)'.format(len(results), elapsed, len(results) / elapsed))
+    print('Rooms per dungeon: min {} median {} mean {:.1f} max {} stdev {:.1f}'.format(
+        rooms[0], statistics.median(rooms), statistics.mean(rooms), rooms[-1],
+        statistics.pstdev(rooms)))
+    areas = sorted(rows * columns for (rows, columns), n in sizes.items() for i in range(n))
+    print('Room interior area: min {} median {} mean {:.1f} max {}'.format(
+        areas[0], statistics.median(areas), statistics.mean(areas), areas[-1]))
+    print('Room interior sides:')
+    sides = Counter()
+    for (rows, columns), n in sizes.items():
+        sides[rows] += n
+        sides[columns] += n
+    total = sum(sides.values())
+    for side in sorted(sides):
+        print('  {:>3} {:6.2%}'.format(side, sides[side] / total))
+    print('Dead ends: {} of {} rooms ({:.2%}), {:.2%} with treasure'.format(
+        dead_ends, sum(rooms), dead_ends / sum(rooms), treasure / dead_ends if dead_ends else 0))
+    print('Dead end ratio by probability:')
+    for probability in sorted(doors, reverse=True):
+        expected = max(0, 100 - probability) / 100
+        print('  {:>3} doors {:>7} dead ends {:>6} observed {:6.2%} expected {:6.2%}'.format(
+            probability, doors[probability], deaths[probability], deaths[probability] / doors[probability], expected))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate dungeons headlessly and report statistics.')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='number of dungeons to generate')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first dungeon; the rest follow in order')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.count)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.map(explore, seeds, chunksize=max(1, args.count // (args.workers * 4)))
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
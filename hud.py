@@ -0,0 +1,68 @@
+from config import *
+
+
+class HUD:
+    """
+    Pre-composited overlay of the player's lives, fruit counts and power up.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.surface = None
+        self.version = None     # HUD version the overlay was last rendered at
+        self.renders = 0
+
+    def draw(self, screen):
+        """
+        Blits the overlay to the screen, re-rendering it first if the HUD values changed.
+        """
+        if self.version != self.game.hud_version:
+            self.render()
+        screen.blit(self.surface, (0, 0))
+
+    def render(self):
+        """
+        Re-renders the overlay from the current game values.
+        """
+        self.surface = pygame.Surface((WIN_WIDTH, WIN_HEIGHT), pygame.SRCALPHA)
+        self.render_lives()
+        self.render_fruit_count()
+        self.render_powers()
+        self.surface.set_alpha(255, pygame.RLEACCEL)    # Mostly transparent, so run-length encoding skips it cheaply
+        self.version = self.game.hud_version
+        self.renders += 1
+
+    def render_lives(self):
+        """
+        Renders player lives in top left corner.
+        """
+        x = 0
+        for life in range(0, self.game.current_lives):
+            self.surface.blit(self.game.assets.get(LIFE), (x, 0))
+            x += TILE_SIZE
+
+    def render_fruit_count(self):
+        """
+        Renders player fruit count in top of screen.
+        """
+        # Fruit sprites
+        sprite_x, screen_x = 0, 182
+        for fruit in range(0, 6):
+            self.surface.blit(self.game.items_sheet.get_frame(sprite_x, 0, 32, 32), (screen_x, 0))
+            sprite_x += TILE_SIZE
+            screen_x += 80
+
+        # Fruit counts
+        screen_x = 214
+        for i in range(0, 6):
+            count = self.game.fruit_count[i]
+            ones, tens, hunds = count % 10, (count // 10) % 10, count // 100
+            t = self.game.small_text.render(str(hunds) + str(tens) + str(ones), 'white')
+            self.surface.blit(t, (screen_x, 9))
+            screen_x += 80
+
+    def render_powers(self):
+        """
+        Renders the current power up in bottom left corner.
+        """
+        if self.game.power_up != 0:
+            self.surface.blit(self.game.items_sheet.get_frame(self.game.power_up * 32, 0, 32, 32), (0, 448))
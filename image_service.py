@@ -0,0 +1,65 @@
+"""
+Serves level backgrounds to the game over rpyc. Images are picked from img/bg/<keyword>/ and served
+pre-scaled to the window as BMP. Copies are shared with generate_bg.py and checked against its manifest,
+so an image is prepared on request only if it is missing or its contents changed since it was prepared.
+
+Usage: python image_service.py [--port PORT]
+"""
+import argparse
+import random as rd
+import threading
+import rpyc
+from rpyc.utils.server import ThreadedServer
+from config import *
+from generate_bg import prepare_background, get_prepared_name, hash_file, load_manifest, save_manifest, \
+    IMAGE_EXTENSIONS
+
+
+class ImageService(rpyc.Service):
+    """
+    Picks a random background for a keyword and returns the path of its prepared copy.
+    """
+    def __init__(self, prepared_dir=PREPARED_BG):
+        self.prepared_dir = prepared_dir
+        self.lock = threading.Lock()    # Connections are served on their own threads
+
+    def exposed_get_image(self, keyword, path):
+        """
+        Returns the path of a background from the given folder's subfolder for the keyword, scaled to the window.
+        """
+        if os.path.basename(keyword) != keyword:
+            raise ValueError('Invalid keyword: ' + keyword)
+        folder = os.path.join(path, keyword)
+        names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+        if len(names) == 0:
+            raise FileNotFoundError('No images for keyword: ' + keyword)
+        return self.get_prepared(keyword, os.path.join(folder, rd.choice(names)))
+
+    def get_prepared(self, keyword, source):
+        """
+        Returns the path of the prepared copy of the source image, preparing it if it is missing or the
+        manifest lists other contents for it, and recording it in the manifest.
+        """
+        name = os.path.join(keyword, os.path.basename(source))
+        target = os.path.abspath(os.path.join(self.prepared_dir, get_prepared_name(name)))
+        digest = hash_file(source)
+        with self.lock:
+            manifest = load_manifest(self.prepared_dir)
+            if manifest.get(name) != digest or not os.path.exists(target):
+                prepare_background(source, target)
+                manifest[name] = digest
+                save_manifest(self.prepared_dir, manifest)
+        return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve level backgrounds to the game.')
+    parser.add_argument('--port', type=int, default=IMAGE_PORT, help='port to listen on')
+    args = parser.parse_args()
+
+    server = ThreadedServer(ImageService(), hostname=IMAGE_HOST, port=args.port)
+    server.start()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 import random as rd
 import math
+import copy
 from config import *
+from room_grid import RoomGrid
 
 
 class MapTree:
@@ -27,11 +29,16 @@ class MapNode:
     """
     Represents an individual dungeon room.
     """
-    def __init__(self, num, data, dimensions, fruit):
+    def __init__(self, num, recipe, dimensions, fruit, seed, cache):
         self.num = num
-        self.data = data
+        self.recipe = recipe        # Lays out the room's items and enemies again on demand
         self.dimensions = dimensions
         self.fruit = fruit
+        self.seed = seed            # Seeds the generation of the rooms behind this room's doors
+        self.cache = cache          # Holds the room's tiles while it is recently used
+        self.fixtures = {}          # (row, column) -> door number or shop tile placed after layout
+        self.treasure = False       # Floor filled with fruit
+        self.cleared_tiles = set()  # Tiles emptied since generation, such as eaten fruit
         self.bridges = {}
         self.cleared = False
         
@@ -45,9 +52,52 @@ class MapNode:
     
     def get_data(self):
         """
-        Returns map data.
+        Returns map data, rebuilding it from the recipe if it is not cached.
         """
-        return self.data
+        return self.cache.get(self)
+
+    def materialize(self):
+        """
+        Rebuilds the room grid from the recipe, then replays what changed since.
+        """
+        grid = self.recipe.build(self.dimensions)[0]
+        for (row, col), tile in self.fixtures.items():
+            grid.set(row, col, tile)
+        if self.treasure:
+            grid.fill_floor(lambda: ITEM_CODES[math.floor(self.recipe.rng.random() * 6)])
+        for row, col in self.cleared_tiles:
+            grid.set(row, col, '.')
+        return grid
+
+    def add_fixture(self, row, col, tile):
+        """
+        Places a door or shop tile in the room.
+        """
+        self.fixtures[(row, col)] = tile
+        self.cache.discard(self)
+
+    def fill_treasure(self):
+        """
+        Marks the room's floor to be filled with fruit.
+        """
+        self.treasure = True
+        self.cache.discard(self)
+
+    def clear_tile(self, row, col):
+        """
+        Empties the tile at the given row and column for good.
+        """
+        self.cleared_tiles.add((row, col))
+        grid = self.cache.peek(self)
+        if grid is not None:
+            grid.set(row, col, '.')
+
+    def eat(self, row, col):
+        """
+        Removes eaten fruit from the room.
+        """
+        self.clear_tile(row, col)
+        self.fruit -= 1
     
     def get_bridges(self):
         """
@@ -105,6 +155,85 @@ class BridgeNode:
         return self.spawn
 
 
+class GenerationContext:
+    """
+    Stands in for the game while rooms are generated, so generation can run away from the
+    game loop. Holds the values generation reads and collects the paths and doors it creates.
+    Door and room numbers come from copies of the game's counters, handed over only with the
+    rooms, so generation that is thrown away uses none of them up.
+    """
+    def __init__(self, game, depth, seed):
+        self.depth = depth
+        self.level = game.level
+        self.paths = game.paths
+        self.counters = game.door_count, game.room_count   # Counters the numbers continue from
+        self.door_count = copy.copy(game.door_count)
+        self.room_count = copy.copy(game.room_count)
+        self.room_cache = game.room_cache
+        self.unopened_doors = []
+        self.locked_doors = []
+        self.rng = rd.Random(seed)
+        self.key = depth, game.level, game.paths     # Inputs that shape the generated rooms
+
+    def increment_paths(self):
+        """
+        Increments the number of open paths by 1.
+        """
+        self.paths += 1
+
+    def decrement_paths(self):
+        """
+        Decrements the number of opened paths by 1.
+        """
+        self.paths -= 1
+
+    def is_current(self, game):
+        """
+        Returns true if the rooms generated here are the ones the game would generate now, false otherwise.
+        """
+        return self.key == (game.depth, game.level, game.paths) \
+            and self.counters[0] is game.door_count and self.counters[1] is game.room_count
+
+    def apply(self, game):
+        """
+        Hands the paths, doors and numbers created during generation over to the game.
+        """
+        game.paths = self.paths
+        game.door_count = self.door_count
+        game.room_count = self.room_count
+        game.unopened_doors.extend(self.unopened_doors)
+        game.locked_doors.extend(self.locked_doors)
+
+
+class RoomRecipe:
+    """
+    The values a room's items and enemies were laid out from, so the layout can be rebuilt.
+    """
+    def __init__(self, seed, depth, level, empty):
+        self.seed = seed
+        self.depth = depth
+        self.level = level
+        self.empty = empty
+        self.rng = None
+
+    def build(self, dimensions):
+        """
+        Returns a new room grid with the items and enemies laid out, along with its fruit count.
+        """
+        self.rng = rd.Random(self.seed)
+        data = generate_room(dimensions[0], dimensions[1])
+        if self.empty:
+            return data, 0
+        fruit = place_items(data, dimensions[0], dimensions[1], self)
+        place_enemies(data, dimensions[0], dimensions[1], self)
+        return data, fruit
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['rng'] = None     # Reseeded by every build
+        return state
+
+
 def start_tree():
     """
     Returns map tree object.
@@ -139,7 +268,7 @@ def generate_next_maps(game, current):
         if game.depth == 99:
             generate_end_room(game, current, key)
             continue
-        seed = rd.random() * 100
+        seed = game.rng.random() * 100
         if seed > dead_seed:
             dead_end(current, key, game)
             continue
@@ -150,6 +279,29 @@ def generate_next_maps(game, current):
     return current
 
 
+def generate_detached_maps(game, current):
+    """
+    Creates the rooms behind the doors of a copy of the given room, leaving the room itself untouched.
+    Returns the copy, to be linked in later by attach_maps.
+    """
+    proxy = copy.copy(current)
+    proxy.bridges = dict(current.bridges)
+    return generate_next_maps(game, proxy)
+
+
+def attach_maps(proxy, current):
+    """
+    Links the rooms generated behind a copy of the current room into the current room.
+    """
+    for key, bridge in proxy.bridges.items():
+        if isinstance(bridge, BridgeNode):
+            for back in bridge.node.bridges.values():
+                if isinstance(back, BridgeNode) and back.node is proxy:
+                    back.node = current
+        current.bridges[key] = bridge
+    return current
+
+
 def new_room_with_door(game, dimensions=None, empty=False):
     """
     Creates a new map node with one door.
@@ -160,7 +312,7 @@ def new_room_with_door(game, dimensions=None, empty=False):
     door_data = {}
     corners = get_corners(node.dimensions)
     d_num, d_coord = create_door(door_data, corners, game)  # First door
-    node.data[d_coord[0]][d_coord[1]] = d_num
+    node.add_fixture(d_coord[0], d_coord[1], d_num)
     game.unopened_doors.pop()
     return node, d_num, d_coord, door_data, corners
 
@@ -180,9 +332,9 @@ def add_doors(node, door_data, corners, game):
     """
     Adds a random number of doors (between 1 -3 more) to the new map node.
     """
-    for i in range(0, get_total_doors()):  # Create up to three more doors
+    for i in range(0, get_total_doors(game)):  # Create up to three more doors
         d_num, d_coord = create_door(door_data, corners, game)
-        node.data[d_coord[0]][d_coord[1]] = d_num
+        node.add_fixture(d_coord[0], d_coord[1], d_num)
         node.bridges[d_num] = door_data[d_num]
         game.increment_paths()
 
@@ -194,7 +346,7 @@ def generate_end_room(game, current, key):
     node, d_num, d_coord, door_data, corners = new_room_with_door(game, (50, 50))
     connect_new_room(node, door_data, d_num, current, key)
     d_num, d_coord = create_door(door_data, corners, game)
-    node.data[d_coord[0]][d_coord[1]] = d_num
+    node.add_fixture(d_coord[0], d_coord[1], d_num)
     node.bridges[d_num] = door_data[d_num]
     game.increment_paths()
 
@@ -222,7 +374,7 @@ def dead_end(current, key, game):
     Creates dead end room.
     """
     node = empty_dead_end(current, key, game)
-    seed = int(rd.random() * 100)
+    seed = int(game.rng.random() * 100)
     if seed < 50:
         treasure_dead_end(node)
 
@@ -240,25 +392,16 @@ def treasure_dead_end(node):
     """
     Fills an empty dead end room with fruit.
     """
-    for i, row in enumerate(node.data):
-        for j, col in enumerate(node.data):
-            if node.data[i][j] == '.':
-                node.data[i][j] = ITEM_CODES[math.floor(rd.random() * 6)]
+    node.fill_treasure()
 
 
 def new_map(game, dimensions, empty):
     """
     Returns new map node with fruit and enemies placed.
     """
-    data = generate_room(dimensions[0], dimensions[1])
-
-    if empty:
-        fruit = 0
-    else:
-        fruit = place_items(data, dimensions[0], dimensions[1], game)
-        place_enemies(data, dimensions[0], dimensions[1], game)
-
-    return MapNode(next(game.room_count), data, dimensions, fruit)
+    recipe = RoomRecipe(game.rng.getrandbits(32), game.depth, game.level, empty)
+    fruit = recipe.build(dimensions)[1]
+    return MapNode(next(game.room_count), recipe, dimensions, fruit, game.rng.getrandbits(32), game.room_cache)
 
 
 def create_first_node(game):
@@ -267,10 +410,10 @@ def create_first_node(game):
     """
     node = new_map(game, (6 + 24, 8 + 24), True)
     corners = get_corners(node.dimensions)
-    node.data[corners[1][0]][corners[1][1]] = 'S'
+    node.add_fixture(corners[1][0], corners[1][1], 'S')
     door_data = {}
     d_num, d_coord = create_door(door_data, [corners[-1]], game)
-    node.data[d_coord[0]][d_coord[1]] = d_num
+    node.add_fixture(d_coord[0], d_coord[1], d_num)
     player = create_player_spawn(node)
     return node, door_data, player
 
@@ -283,18 +426,18 @@ def create_second_node(game):
     corners = get_corners(node.dimensions)
     door_data = {}
     d_num, d_coord = create_door(door_data, [corners[-1]], game)
-    node.data[d_coord[0]][d_coord[1]] = d_num
+    node.add_fixture(d_coord[0], d_coord[1], d_num)
     game.unopened_doors.pop()
     d_num, d_coord = create_door(door_data, [corners[-2]], game)
-    node.data[d_coord[0]][d_coord[1]] = d_num
+    node.add_fixture(d_coord[0], d_coord[1], d_num)
     return node, door_data
 
 
-def get_total_doors():
+def get_total_doors(game):
     """
     Returns total number of doors for the new room.
     """
-    seed = int(rd.random() * 100)
+    seed = int(game.rng.random() * 100)
     doors = 1           # 100% chance of second door
     if seed >= 50:      # 50% chance of third door
         doors += 1
@@ -308,7 +451,7 @@ def create_door(door_data, corners, game):
     Gets new door number and door spawn point.
     """
     d_num = next(game.door_count)                        # Increment the door count
-    index = math.floor(rd.random() * len(corners))  # Randomly get index
+    index = math.floor(game.rng.random() * len(corners))  # Randomly get index
     d_coord = corners[index]                        # Get corner coord
     door_data[d_num] = d_coord                      # Save coordinate
     del corners[index]                              # Delete coordinate from corners
@@ -322,31 +465,18 @@ def create_door(door_data, corners, game):
 
 def generate_room(rows, columns):
     """
-    Creates the data for new dungeon in form of 2D matrix.
+    Creates the data for new dungeon as an empty room grid.
     """
-    matrix = []
-    for r in range(0, rows):
-        if r < 12 or r > rows - 13:
-            matrix.append(['B'] * columns)
-        else:
-            floor = (['.'] * (columns - 24))
-            matrix.append((['B'] * 12) + floor + (['B'] * 12))
-    return matrix
+    return RoomGrid(rows, columns)
 
 
 def place_items(data, rows, columns, game):
     """
     Randomly places items in the dungeon room.
     """
-    n = get_total_items(game)
     items = ['Ch', 'Ba', 'Me', 'Gr', 'Or', 'Ap']
-    count = 0
-    while count < n:
-        r, c = math.floor(rd.random() * (rows - 28)), math.floor(rd.random() * (columns - 28))
-        if data[r + 14][c + 14] == '.':
-            data[r + 14][c + 14] = items[math.floor(rd.random() * 6)]
-            count += 1
-    return count
+    fruit = [items[math.floor(game.rng.random() * 6)] for i in range(get_total_items(game))]
+    return place_tiles(data, (14, 14, rows - 14, columns - 14), fruit, game)
 
 
 def get_total_items(game):
@@ -360,13 +490,19 @@ def place_enemies(matrix, rows, columns, game):
     """
     Randomly places enemies in the dungeon room.
     """
-    i = 0
-    while i < get_total_enemies(game):
-        r = math.floor(rd.random() * (rows - 24))
-        c = math.floor(rd.random() * (columns - 24))
-        if matrix[r + 14][c + 14] == '.':
-            matrix[r + 14][c + 14] = get_enemy(game)
-            i += 1
+    enemies = [get_enemy(game) for i in range(get_total_enemies(game))]
+    place_tiles(matrix, (14, 14, rows - 10, columns - 10), enemies, game)
+
+
+def place_tiles(data, area, tiles, game):
+    """
+    Places the tiles on distinct random free cells of the (top, left, bottom, right) area.
+    Places as many as there are free cells for and returns how many were placed.
+    """
+    free = data.get_free_cells(*area)
+    cells = game.rng.sample(free, min(len(tiles), len(free)))
+    data.place(cells, tiles[:len(cells)])
+    return len(cells)
 
 
 def get_enemy(game):
@@ -384,7 +520,7 @@ def get_enemy(game):
         probability = LV4_ENEMY
 
     for key in probability:
-        if int(rd.random() * 100) <= key:
+        if int(game.rng.random() * 100) <= key:
             return probability[key]
     return '.'
 
@@ -400,7 +536,7 @@ def get_random_dimensions(game):
     """
     Returns random room dimensions. Size range increases with player depth.
     """
-    rows, columns = rd.randint(6, 10) + game.depth // 4, rd.randint(6, 10) + game.depth // 4  # Get random dimensions
+    rows, columns = game.rng.randint(6, 10) + game.depth // 4, game.rng.randint(6, 10) + game.depth // 4  # Get random dimensions
     rows, columns = rows + 24, columns + 24  # Adjust rows/columns for border
     return rows, columns
 
@@ -0,0 +1,57 @@
+from collections import deque
+from config import *
+
+
+class FlowField:
+    """
+    Breadth-first distance field over the walkable tiles of a room, counting the steps
+    from every tile to a target tile. Shared by every enemy chasing the same target.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.target = None
+        self.distances = None   # Row -> column -> steps to the target, -1 where unreachable
+        self.builds = 0
+
+    def build(self, target):
+        """
+        Recomputes the distance field toward the given (row, column) tile.
+        """
+        grid = self.grid
+        self.target = target
+        self.distances = [[-1] * grid.columns for _ in range(grid.rows)]
+        self.builds += 1
+        if not grid.is_walkable(*target):
+            return
+        self.distances[target[0]][target[1]] = 0
+        frontier = deque([target])
+        while frontier:
+            row, col = frontier.popleft()
+            steps = self.distances[row][col] + 1
+            for dx, dy in DIRECTION_VECTORS.values():
+                r, c = row + dy, col + dx
+                if grid.is_walkable(r, c) and self.distances[r][c] == -1:
+                    self.distances[r][c] = steps
+                    frontier.append((r, c))
+
+    def get_distance(self, row, col):
+        """
+        Returns the steps from the tile to the target, or -1 if it cannot be reached.
+        """
+        if 0 <= row < self.grid.rows and 0 <= col < self.grid.columns:
+            return self.distances[row][col]
+        return -1
+
+    def get_steps(self, tile, target):
+        """
+        Returns the directions that take one step closer to the target from the given tile,
+        rebuilding the field first if the target moved.
+        """
+        if target != self.target:
+            self.build(target)
+        distance = self.get_distance(*tile)
+        if distance <= 0:
+            return []
+        row, col = tile
+        return [direction for direction, (dx, dy) in DIRECTION_VECTORS.items()
+                if self.get_distance(row + dy, col + dx) == distance - 1]
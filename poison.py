@@ -0,0 +1,43 @@
+import heapq
+from collision import tiles_under
+from config import *
+
+
+class PoisonField:
+    """
+    Sparse map of the poisoned floor tiles in a room to the time their poison wears off.
+    """
+    def __init__(self):
+        self.tiles = {}         # (row, column) -> expiry time
+        self.expirations = []   # Min-heap of (expiry time, tile)
+
+    def clear(self):
+        """
+        Removes all poison.
+        """
+        self.tiles.clear()
+        self.expirations.clear()
+
+    def spread(self, rect, now):
+        """
+        Poisons every tile the rect touches that is not already poisoned.
+        """
+        for tile in tiles_under(rect):
+            if tile not in self.tiles:
+                self.tiles[tile] = now + POISON_TIME
+                heapq.heappush(self.expirations, (now + POISON_TIME, tile))
+
+    def expire(self, now):
+        """
+        Removes poison from the tiles whose time has run out.
+        """
+        while self.expirations and self.expirations[0][0] < now:
+            expiry, tile = heapq.heappop(self.expirations)
+            if self.tiles.get(tile) == expiry:
+                del self.tiles[tile]
+
+    def is_poisoned(self, rect):
+        """
+        Returns true if the rect touches a poisoned tile, false otherwise.
+        """
+        return any(tile in self.tiles for tile in tiles_under(rect))
@@ -0,0 +1,78 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+
+
+class LevelPrefetcher:
+    """
+    Loads the background and song of a level change while the player is still a few rooms away from
+    the depth it happens at, so the change itself only swaps in what is already in memory.
+    """
+    def __init__(self, backgrounds, distance=PREFETCH_DISTANCE):
+        self.backgrounds = backgrounds
+        self.distance = distance
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self.songs = {}     # Song path -> future of its contents
+        self.hits = 0
+        self.misses = 0
+
+    def get_upcoming(self, depth, level):
+        """
+        Returns the background keyword and song of each level change within reach of the given depth,
+        going deeper into the next level or back up into the previous one.
+        """
+        upcoming = []
+        if level < len(BACKGROUND) and 0 <= PROG[level] - depth <= self.distance:
+            upcoming.append((BACKGROUND[level], MUSIC[level]))
+        if level >= 2 and 0 <= depth - REG[level] <= self.distance:
+            upcoming.append((BACKGROUND[level - 2], MUSIC[level - 2]))
+        return upcoming
+
+    def update(self, depth, level):
+        """
+        Starts loading the assets of level changes within reach of the given depth, and lets go of
+        songs no longer within reach.
+        """
+        upcoming = self.get_upcoming(depth, level)
+        songs = {song for keyword, song in upcoming}
+        for song in list(self.songs):
+            if song not in songs:
+                self.songs.pop(song).cancel()
+        for keyword, song in upcoming:
+            self.backgrounds.request(keyword)
+            if song not in self.songs:
+                self.songs[song] = self.executor.submit(self.read, song)
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the contents of a file. Runs on the worker thread.
+        """
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def get_song(self, song):
+        """
+        Returns the prefetched song as an in-memory file, or None if it was not prefetched or is still
+        being read, in which case the song is played from disk instead of waited for.
+        """
+        future = self.songs.pop(song, None)
+        if future is None or not future.done() or future.cancelled():
+            self.misses += 1
+            return None
+        try:
+            data = future.result()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return io.BytesIO(data)
+
+    def close(self):
+        """
+        Stops the worker thread.
+        """
+        for future in self.songs.values():
+            future.cancel()
+        self.songs.clear()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+import level_generation as level
+
+
+class RoomPregenerator:
+    """
+    Generates the rooms behind the doors of the player's current room on a worker thread,
+    so walking into a new room only has to link rooms that already exist.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pregeneration')
+        self.room = None        # Room whose neighbours are being generated
+        self.pending = {}       # Room number -> (generation context, future detached room)
+        self.hits = 0
+        self.misses = 0
+
+    def schedule(self, room):
+        """
+        Starts generating the rooms behind every unvisited neighbour of the given room.
+        """
+        self.cancel()
+        self.room = room
+        for bridge in room.get_bridges().values():
+            if not isinstance(bridge, level.BridgeNode):
+                continue
+            node = bridge.get_node()
+            if node.num in self.game.visited or node.num in self.pending:
+                continue
+            context = level.GenerationContext(self.game, self.game.depth + 1, node.seed)
+            self.pending[node.num] = context, self.executor.submit(level.generate_detached_maps, context, node)
+
+    def cancel(self):
+        """
+        Drops all pregenerated rooms that have not been used.
+        """
+        for context, future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.room = None
+
+    def generate_next_maps(self, node):
+        """
+        Links the rooms behind the given room's doors into the map tree, using the pregenerated
+        rooms if they were generated for the game as it is now, otherwise generating them here.
+        """
+        context, future = self.pending.pop(node.num, (None, None))
+        self.cancel()
+        if future is not None and context.is_current(self.game) and not future.cancel():
+            self.hits += 1
+            level.attach_maps(future.result(), node)
+        else:
+            self.misses += 1
+            context = level.GenerationContext(self.game, self.game.depth, node.seed)
+            level.generate_next_maps(context, node)
+        context.apply(self.game)
+        return node
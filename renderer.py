@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from config import *
+
+
+class RoomRenderer:
+    """
+    Pre-renders the static ground and wall layer of a dungeon room onto a single surface.
+    """
+    def __init__(self, game, capacity=ROOM_SURFACE_CACHE):
+        self.game = game
+        self.capacity = capacity
+        self.surfaces = OrderedDict()   # Map node -> baked surface, least recently used first
+        self.surface = None
+
+    def load(self, node):
+        """
+        Sets the given map node as the room being rendered, baking it if needed.
+        """
+        if node in self.surfaces:
+            self.surfaces.move_to_end(node)
+        else:
+            self.surfaces[node] = self.bake(node)
+            if len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+        self.surface = self.surfaces[node]
+
+    def bake(self, node):
+        """
+        Returns a surface with every ground and wall tile of the map node drawn onto it.
+        """
+        grid = node.get_data()
+        surface = pygame.Surface((grid.columns * TILE_SIZE, grid.rows * TILE_SIZE)).convert()
+        surface.fill(NASTY_GREEN)
+        ground = self.game.terrain_sheet.get_frame(0, 0, TILE_SIZE, TILE_SIZE)
+        tiles = []
+        for y, row in enumerate(grid.get_mask(['B'])):
+            for x, wall in enumerate(row):
+                if wall:
+                    surface.fill(BLACK, (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+                else:
+                    tiles.append((ground, (x * TILE_SIZE, y * TILE_SIZE)))
+        surface.blits(tiles, doreturn=False)
+        surface.set_colorkey(NASTY_GREEN, pygame.RLEACCEL)
+        return surface
+
+    def draw(self, screen, camera):
+        """
+        Blits the visible slice of the room to the screen.
+        """
+        screen.blit(self.surface, (0, 0), camera.get_view())
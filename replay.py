@@ -0,0 +1,371 @@
+"""
+Records the input of a run to a compact binary log and plays it back deterministically, either
+headless as fast as possible or in the game window at real speed. Given several logs, replays each
+headless and reports its speed, as a regression benchmark.
+
+Logs hold keyframes of the whole world every KEYFRAME_INTERVAL ticks and mark the tick each room
+was entered on, so playback can seek to a tick or room by replaying only from the keyframe before it.
+
+Usage: python replay.py LOG [LOG ...] [--realtime] [--rooms] [--seek TICK | --room ROOM]
+"""
+import argparse
+import bisect
+import os
+import struct
+import sys
+import time
+import zlib
+from simulation import *
+
+MAGIC = b'HSKY'
+VERSION = 4
+HEADER = struct.Struct('<4sBQHB10I')    # Magic, version, seed, tick length, total lives, fruit counts
+COUNTS = struct.Struct('<IIIII')        # Ticks, purchases, rooms entered, keyframes, compressed input length
+PURCHASE = struct.Struct('<IBHB')       # Tick, cost code, cost, ware code
+ROOM = struct.Struct('<IHI')            # Tick, depth, room number
+KEYFRAME = struct.Struct('<IHII')       # Tick, depth, room number, state length
+SUMMARY = struct.Struct('<QHBiiII')     # Logical time, depth, current lives, player position, room number, state CRC
+INPUT_BITS = {UP: 1, DOWN: 2, LEFT: 4, RIGHT: 8, INTERACT: 16, USE_POWER: 32}
+ACTIONS = (INTERACT, USE_POWER)         # Order actions are taken in within a tick
+ATOMS = (type(None), bool, int, float, str, bytes, type, pygame.Rect)  # Values a digest takes as they are
+
+
+def summarize(sim):
+    """
+    Returns the state a run ended in, to tell whether a replay diverged from its recording.
+    The CRC of the saved world catches divergence the other values miss.
+    """
+    x, y = (sim.player.rect.x, sim.player.rect.y) if sim.player is not None else (-1, -1)
+    room = sim.loc.get_num() if sim.loc is not None else 0
+    return sim.ticks, sim.depth, sim.current_lives, x, y, room, get_digest(sim)
+
+
+def get_digest(sim):
+    """
+    Returns a CRC of the state keyframes keep, walked in a fixed order so the same world gives the
+    same CRC however it was reached. Sets are walked sorted and shared objects by the order first met.
+    """
+    state = {key: getattr(sim, key) for key in sim.saved}
+    names = {id(value): i for i, value in enumerate(state.values()) if not isinstance(value, ATOMS)}
+    seen = {}       # Id of each mutable object walked -> order first met in, and the object kept alive
+
+    def get_order(item):
+        if id(item) in names:
+            return 0, names[id(item)]
+        if id(item) in seen:
+            return 1, seen[id(item)][0]
+        return 2, repr(item)
+
+    crc = 0
+    stack = [state]
+    while stack:
+        obj = stack.pop()
+        children = ()
+        if obj is sim or obj is sim.room_cache:
+            token = 'sim' if obj is sim else 'room_cache'
+        elif isinstance(obj, FrameSheet):
+            token = obj.name
+        elif isinstance(obj, ATOMS):
+            token = repr(obj)
+        elif isinstance(obj, tuple):
+            token, children = 'tuple', obj
+        elif isinstance(obj, frozenset):
+            token, children = 'frozenset', sorted(obj, key=get_order)
+        elif id(obj) in seen:
+            token = '@{}'.format(seen[id(obj)][0])
+        else:
+            seen[id(obj)] = len(seen), obj
+            token = type(obj).__name__
+            if isinstance(obj, list):
+                children = obj
+            elif isinstance(obj, dict):
+                children = [item for pair in obj.items() for item in pair]
+            elif isinstance(obj, set):
+                children = sorted(obj, key=get_order)
+            else:
+                children = obj.__getstate__(),
+        crc = zlib.crc32('{}:{};'.format(token, len(children)).encode(), crc)
+        stack.extend(reversed(children))
+    return crc
+
+
+class InputLog:
+    """
+    The seed, starting tallies and per-tick input of a run, one byte per tick.
+    """
+    def __init__(self, seed, tick_ms=TICK_MS, total_lives=1, fruit_count=None):
+        self.seed = seed
+        self.tick_ms = tick_ms
+        self.total_lives = total_lives
+        self.fruit_count = [fruit_count[i] for i in range(10)] if fruit_count is not None else [0] * 10
+        self.inputs = bytearray()
+        self.purchases = {}     # Tick -> purchases made in it
+        self.rooms = []         # (tick, depth, room number) of each room entered, by tick
+        self.keyframes = []     # (tick, depth, room number, state) by tick
+        self.summary = None
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def add(self, held, actions):
+        """
+        Appends a tick's held directions and actions.
+        """
+        bits = 0
+        for key in held:
+            bits |= INPUT_BITS[key]
+        for key in actions:
+            bits |= INPUT_BITS[key]
+        self.inputs.append(bits)
+
+    def add_purchase(self, cost_code, cost, ware):
+        """
+        Appends a purchase made in the latest tick.
+        """
+        self.purchases.setdefault(len(self.inputs) - 1, []).append((cost_code, cost, ware))
+
+    def add_room(self, sim):
+        """
+        Marks the room the world is in as entered before the next tick.
+        """
+        self.rooms.append((len(self.inputs), sim.depth, sim.loc.get_num()))
+
+    def add_keyframe(self, sim):
+        """
+        Appends a keyframe of the world as it is before the next tick.
+        """
+        self.keyframes.append((len(self.inputs), sim.depth, sim.loc.get_num(), sim.save_state()))
+
+    def get_keyframe(self, tick):
+        """
+        Returns the latest keyframe at or before the given tick, or None if there is none.
+        """
+        i = bisect.bisect_right(self.keyframes, tick, key=lambda keyframe: keyframe[0])
+        return self.keyframes[i - 1] if i > 0 else None
+
+    def get_input(self, tick):
+        """
+        Returns the held directions and actions of the given tick.
+        """
+        bits = self.inputs[tick]
+        held = {key for key in (UP, DOWN, LEFT, RIGHT) if bits & INPUT_BITS[key]}
+        actions = [key for key in ACTIONS if bits & INPUT_BITS[key]]
+        return held, actions
+
+    def get_purchases(self, tick):
+        """
+        Returns the purchases made in the given tick.
+        """
+        return self.purchases.get(tick, [])
+
+    def save(self, path):
+        """
+        Writes the log to the given file.
+        """
+        compressed = zlib.compress(bytes(self.inputs), 9)
+        purchases = [(tick, *purchase) for tick in sorted(self.purchases) for purchase in self.purchases[tick]]
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.tick_ms, self.total_lives, *self.fruit_count))
+            file.write(COUNTS.pack(len(self.inputs), len(purchases), len(self.rooms), len(self.keyframes),
+                                   len(compressed)))
+            for purchase in purchases:
+                file.write(PURCHASE.pack(*purchase))
+            for room in self.rooms:
+                file.write(ROOM.pack(*room))
+            file.write(compressed)
+            for tick, depth, room, state in self.keyframes:
+                file.write(KEYFRAME.pack(tick, depth, room, len(state)))
+                file.write(state)
+            if self.summary is not None:
+                file.write(SUMMARY.pack(*self.summary))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns the log read from the given file.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, seed, tick_ms, total_lives, *fruit_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a version {} replay log'.format(path, VERSION))
+        log = cls(seed, tick_ms, total_lives, fruit_count)
+        offset = HEADER.size
+        ticks, purchases, rooms, keyframes, size = COUNTS.unpack_from(data, offset)
+        offset += COUNTS.size
+        for i in range(purchases):
+            tick, *purchase = PURCHASE.unpack_from(data, offset)
+            log.purchases.setdefault(tick, []).append(tuple(purchase))
+            offset += PURCHASE.size
+        for i in range(rooms):
+            log.rooms.append(ROOM.unpack_from(data, offset))
+            offset += ROOM.size
+        log.inputs = bytearray(zlib.decompress(data[offset:offset + size]))
+        if len(log.inputs) != ticks:
+            raise ValueError('{} is truncated'.format(path))
+        offset += size
+        for i in range(keyframes):
+            tick, depth, room, length = KEYFRAME.unpack_from(data, offset)
+            offset += KEYFRAME.size
+            log.keyframes.append((tick, depth, room, data[offset:offset + length]))
+            offset += length
+        if len(data) >= offset + SUMMARY.size:
+            log.summary = SUMMARY.unpack_from(data, offset)
+        return log
+
+
+class Recorder:
+    """
+    Records a run into an input log as the simulation steps. Keyframes are taken only every given
+    number of ticks, never on entering a room: pickling the world costs tens of KB and would stall
+    the frame the next room is built on. Entering a room only marks its tick, so seeking to a tick
+    or room replays at most an interval of ticks from the keyframe before it.
+    """
+    def __init__(self, sim, interval=KEYFRAME_INTERVAL):
+        self.sim = sim
+        self.log = InputLog(sim.seed, TICK_MS, sim.total_lives, sim.fruit_count)
+        self.interval = interval
+        self.room_entered = True
+
+    def record(self, held, actions):
+        """
+        Records a tick's held directions and actions, after the room entered and a keyframe if due.
+        """
+        if self.room_entered:
+            self.log.add_room(self.sim)
+            self.room_entered = False
+        if len(self.log) % self.interval == 0:
+            self.log.add_keyframe(self.sim)
+        self.log.add(held, actions)
+
+    def enter_room(self):
+        """
+        Marks the room entered before the next tick, once the world is settled.
+        """
+        self.room_entered = True
+
+    def record_purchase(self, cost_code, cost, ware):
+        """
+        Records a purchase made in the current tick.
+        """
+        self.log.add_purchase(cost_code, cost, ware)
+
+    def save(self, path, sim):
+        """
+        Records the state the run ended in and writes the log to the given file.
+        """
+        self.log.summary = summarize(sim)
+        self.log.save(path)
+
+
+def seek(log, sim, tick):
+    """
+    Brings the simulation to the state it was in before the given tick of the log, replaying
+    from the keyframe before it.
+    """
+    keyframe = log.get_keyframe(tick)
+    if keyframe is None:
+        sim.total_lives = log.total_lives
+        sim.fruit_count = dict(enumerate(log.fruit_count))
+        sim.reset(log.seed)
+        sim.start()
+        start = 0
+    else:
+        sim.load_state(keyframe[3])
+        start = keyframe[0]
+    sim.playing = True
+    sim.replaying = True
+    for i in range(start, tick):
+        sim.held, sim.actions = log.get_input(i)
+        sim.purchases = log.get_purchases(i)
+        sim.step(log.tick_ms)
+
+
+def replay(log, sim, realtime=False, start=0):
+    """
+    Plays the log back on the simulation from the given tick, stepping once per recorded tick, and
+    returns the tick it stopped at. Draws each tick at real speed when realtime, otherwise steps as
+    fast as possible.
+    """
+    seek(log, sim, start)
+    for tick in range(start, len(log)):
+        sim.held, sim.actions = log.get_input(tick)
+        sim.purchases = log.get_purchases(tick)
+        sim.step(log.tick_ms)
+        if realtime:
+            if pygame.event.peek(pygame.QUIT):
+                return tick + 1
+            sim.draw()
+        if not sim.playing:
+            return tick + 1
+    return len(log)
+
+
+def benchmark(paths):
+    """
+    Replays every log headless, reporting its speed and whether it ended where it was recorded.
+    Returns true if none diverged, false otherwise.
+    """
+    total_ticks, total_time, matched = 0, 0, True
+    for path in paths:
+        log = InputLog.load(path)
+        sim = Simulation()
+        start = time.perf_counter()
+        ticks = replay(log, sim)
+        elapsed = time.perf_counter() - start
+        sim.pregenerator.cancel()
+        result = 'unchecked'
+        if log.summary is not None:
+            result = 'ok' if summarize(sim) == tuple(log.summary) else 'DIVERGED'
+            matched = matched and result == 'ok'
+        total_ticks += ticks
+        total_time += elapsed
+        print('{}: {} ticks in {:.2f}s ({:.0f} ticks/s) {}'.format(path, ticks, elapsed, ticks / elapsed, result))
+    if len(paths) > 1:
+        print('Total: {} ticks in {:.2f}s ({:.0f} ticks/s)'.format(total_ticks, total_time, total_ticks / total_time))
+    return matched
+
+
+def list_rooms(log):
+    """
+    Prints the rooms of the log in the order entered, with the keyframe seeking to each replays from.
+    """
+    for tick, depth, room in log.rooms:
+        print('tick {:>7} ({:>6.1f}s) depth {:>3} room {:>5} from keyframe at tick {:>7}'.format(
+            tick, tick * log.tick_ms / 1000, depth, room, log.get_keyframe(tick)[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play back recorded runs.')
+    parser.add_argument('logs', nargs='+', metavar='LOG', help='replay logs recorded with game.py --record')
+    parser.add_argument('--realtime', action='store_true', help='play the first log in the game window')
+    parser.add_argument('--rooms', action='store_true', help='list the rooms entered in the first log')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--seek', type=int, default=0, metavar='TICK', help='start playback at this tick')
+    group.add_argument('--room', type=int, metavar='ROOM', help='start playback on first entering this room')
+    args = parser.parse_args()
+
+    log = InputLog.load(args.logs[0])
+    start = args.seek
+    if args.room is not None:
+        start = next((tick for tick, depth, room in log.rooms if room == args.room), None)
+        if start is None:
+            sys.exit('Room {} was never entered'.format(args.room))
+    if args.rooms:
+        list_rooms(log)
+    elif args.realtime:
+        from game import Game
+        replay(log, Game(), realtime=True, start=start)
+    elif start > 0:
+        sim = Simulation()
+        begin = time.perf_counter()
+        seek(log, sim, start)
+        print('Tick {}: depth {} room {} lives {} in {:.3f}s'.format(
+            start, sim.depth, sim.loc.get_num(), sim.current_lives, time.perf_counter() - begin))
+        sim.pregenerator.cancel()
+    else:
+        sys.exit(0 if benchmark(args.logs) else 1)
+
+
+if __name__ == '__main__':
+    main()
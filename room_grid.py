@@ -0,0 +1,162 @@
+from collections import OrderedDict
+import threading
+import numpy as np
+from config import *
+
+TILES = ['.', 'B', 'S'] + ITEM_CODES + ENEMY_CODES     # Code -> tile; door numbers come after
+CODES = {tile: code for code, tile in enumerate(TILES)}
+FLOOR, WALL = CODES['.'], CODES['B']
+DOOR_BASE = len(TILES)
+
+
+def encode(tile):
+    """
+    Returns the integer code of a tile. Door numbers are coded past the named tiles.
+    """
+    if isinstance(tile, int):
+        return DOOR_BASE + tile
+    return CODES[tile]
+
+
+def decode(code):
+    """
+    Returns the tile stored under an integer code.
+    """
+    code = int(code)
+    if code >= DOOR_BASE:
+        return code - DOOR_BASE
+    return TILES[code]
+
+
+class RoomGrid:
+    """
+    Tiles of a dungeon room. Only the interior is stored, as an array of integer codes;
+    the wall border padding it on every side is implied.
+    """
+    def __init__(self, rows, columns, border=ROOM_BORDER):
+        self.rows = rows
+        self.columns = columns
+        self.border = border
+        self.interior = np.full((rows - 2 * border, columns - 2 * border), FLOOR, dtype=np.uint16)
+
+    def is_interior(self, row, col):
+        """
+        Returns true if the tile lies inside the border, false otherwise.
+        """
+        b = self.border
+        return b <= row < self.rows - b and b <= col < self.columns - b
+
+    def get(self, row, col):
+        """
+        Returns the tile at the given row and column.
+        """
+        if not self.is_interior(row, col):
+            return 'B'
+        return decode(self.interior[row - self.border, col - self.border])
+
+    def set(self, row, col, tile):
+        """
+        Places a tile at the given row and column, which must lie inside the border.
+        """
+        if not self.is_interior(row, col):
+            raise IndexError('tile ({}, {}) is in the room border'.format(row, col))
+        self.interior[row - self.border, col - self.border] = encode(tile)
+
+    def cells(self):
+        """
+        Returns the row, column and tile of every interior tile that is not plain floor.
+        """
+        b = self.border
+        rows, cols = np.nonzero(self.interior != FLOOR)
+        return [(int(r) + b, int(c) + b, decode(self.interior[r, c])) for r, c in zip(rows, cols)]
+
+    def get_free_cells(self, top, left, bottom, right):
+        """
+        Returns the (row, column) of every plain floor tile from top left up to, not including,
+        bottom right, in row order.
+        """
+        b = self.border
+        top, left = max(top, b), max(left, b)
+        bottom, right = min(bottom, self.rows - b), min(right, self.columns - b)
+        if top >= bottom or left >= right:
+            return []
+        rows, cols = np.nonzero(self.interior[top - b:bottom - b, left - b:right - b] == FLOOR)
+        return list(zip((rows + top).tolist(), (cols + left).tolist()))
+
+    def place(self, cells, tiles):
+        """
+        Places each tile at the matching (row, column) cell, which must lie inside the border.
+        """
+        if len(cells) == 0:
+            return
+        b = self.border
+        rows, cols = zip(*cells)
+        self.interior[np.array(rows) - b, np.array(cols) - b] = [encode(tile) for tile in tiles]
+
+    def get_mask(self, tiles):
+        """
+        Returns a full-size boolean array marking the tiles of the given kinds, border included.
+        """
+        b = self.border
+        mask = np.full((self.rows, self.columns), 'B' in tiles)
+        mask[b:self.rows - b, b:self.columns - b] = np.isin(self.interior, [encode(tile) for tile in tiles])
+        return mask
+
+    def fill_floor(self, pick):
+        """
+        Replaces every plain floor tile with a tile from pick(), in row order.
+        """
+        floor = self.interior == FLOOR
+        self.interior[floor] = [encode(pick()) for _ in range(int(floor.sum()))]
+
+
+class RoomCache:
+    """
+    Room grids of the most recently used map nodes. Safe to share between the game loop
+    and the room generation thread.
+    """
+    def __init__(self, capacity=ROOM_GRID_CACHE):
+        self.capacity = capacity
+        self.grids = OrderedDict()  # Map node -> room grid, least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, node):
+        """
+        Returns the node's room grid, materializing it if it is not cached.
+        """
+        with self.lock:
+            if node in self.grids:
+                self.hits += 1
+                self.grids.move_to_end(node)
+                return self.grids[node]
+            self.misses += 1
+        grid = node.materialize()
+        with self.lock:
+            self.grids[node] = grid
+            self.grids.move_to_end(node)
+            if len(self.grids) > self.capacity:
+                self.grids.popitem(last=False)
+        return grid
+
+    def peek(self, node):
+        """
+        Returns the node's room grid if it is cached, otherwise None.
+        """
+        with self.lock:
+            return self.grids.get(node)
+
+    def discard(self, node):
+        """
+        Drops the node's room grid so it is materialized again on next use.
+        """
+        with self.lock:
+            self.grids.pop(node, None)
+
+    def clear(self):
+        """
+        Drops every cached room grid.
+        """
+        with self.lock:
+            self.grids.clear()
@@ -0,0 +1,650 @@
+import io
+import pickle
+import threading
+import zlib
+import random as rd
+from sprites import *
+from spatial import SpatialGroup
+from collision import PassabilityGrid
+from poison import PoisonField
+from pathfinding import FlowField
+from vision import VisionTable
+from pregeneration import RoomPregenerator
+from room_grid import RoomCache
+import level_generation as level
+
+
+class Sequence:
+    """
+    Incremental sequence of numbers starting with 0, safe to draw from on several threads.
+    """
+    def __init__(self):
+        self.n = 0
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            n = self.n
+            self.n += 1
+        return n
+
+    def __getstate__(self):
+        return {'n': self.n}
+
+    def __setstate__(self, state):
+        self.n = state['n']
+        self.lock = threading.Lock()
+
+
+class StatePickler(pickle.Pickler):
+    """
+    Pickles simulation state, writing the simulation itself, its room cache and its sprite sheets
+    as references so they resolve to those of whichever simulation the state is loaded into.
+    """
+    def __init__(self, file, sim):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.sim = sim
+
+    def persistent_id(self, obj):
+        if obj is self.sim:
+            return 'sim'
+        if obj is self.sim.room_cache:
+            return 'room_cache'
+        if isinstance(obj, FrameSheet):
+            return 'sheet', obj.name
+        return None
+
+
+class StateUnpickler(pickle.Unpickler):
+    """
+    Unpickles simulation state into the given simulation.
+    """
+    def __init__(self, file, sim):
+        super().__init__(file)
+        self.sim = sim
+
+    def persistent_load(self, pid):
+        if pid == 'sim':
+            return self.sim
+        if pid == 'room_cache':
+            return self.sim.room_cache
+        return next(sheet for sheet in self.sim.sprite_sheets if sheet.name == pid[1])
+
+
+class Simulation:
+    """
+    The game world and its rules, stepped on a logical clock with no display, sound or waiting.
+    Presentation happens through hooks that do nothing here and are overridden by the front end.
+    """
+    UNSAVED = {'pregenerator', 'room_cache', 'recorder', 'shop', 'passability', 'flow_field', 'vision',
+               'character_sheet', 'enemy_sheet', 'npc_sheet', 'terrain_sheet', 'door_sheet', 'items_sheet',
+               'sprite_sheets',
+               'playing', 'held', 'actions', 'purchases', 'replaying'}     # Set by whoever steps the world
+
+    def __init__(self):
+        front_end = set(vars(self))     # Set by a front end before its simulation
+
+        # Fundamentals
+        self.playing = False
+        self.player = None
+        self.loc = None
+        self.friend_eater = None
+        self.shop = None
+        self.door_count = Sequence()
+        self.room_count = Sequence()
+        self.pregenerator = RoomPregenerator(self)
+        self.room_cache = RoomCache()
+        self.ticks = 0          # Logical clock in milliseconds
+        self.held = set()       # Directions currently held down
+        self.actions = []       # Actions taken this tick, in order
+        self.purchases = []     # Purchases made in the shop this tick, as (cost code, cost, ware code)
+        self.seed = None
+        self.rng = rd.Random()
+        self.recorder = None
+        self.replaying = False  # Input comes from a replay log, not the user
+
+        # Sprite sheets
+        self.character_sheet = self.load_sheet('img/player_sheet.png')
+        self.enemy_sheet = self.load_sheet('img/enemy_sheet.png')
+        self.npc_sheet = self.load_sheet('img/npc_sheet.png')
+        self.terrain_sheet = self.load_sheet('img/terrain_sheet.png')
+        self.door_sheet = self.load_sheet('img/door_sheet.png')
+        self.items_sheet = self.load_sheet('img/items_sheet.png')
+        self.sprite_sheets = (self.character_sheet, self.enemy_sheet, self.npc_sheet,
+                              self.terrain_sheet, self.door_sheet, self.items_sheet)
+
+        # World
+        self.passability = None
+        self.flow_field = None
+        self.vision = None
+        self.all_sprites = SpatialGroup()
+        self.all_items = pygame.sprite.LayeredUpdates()
+        self.all_doors = pygame.sprite.LayeredUpdates()
+        self.all_enemies = pygame.sprite.LayeredUpdates()
+        self.ticking = pygame.sprite.LayeredUpdates()     # Sprites with per-frame behavior
+        self.doors = pygame.sprite.LayeredUpdates()
+        self.enemies = pygame.sprite.LayeredUpdates()
+        self.attacks = pygame.sprite.LayeredUpdates()
+        self.poison = PoisonField()
+
+        # Counts and tallies
+        self.current_lives = 1
+        self.total_lives = 1
+        self.fruit_count = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0, 9: 0}
+        self.power_up = 0
+        self.hud_version = 0    # Bumped whenever lives, fruit or the power up change
+        self.visited = [0]
+        self.unvisited = 0
+        self.depth = 0
+        self.level = 0
+        self.paths = 0
+        self.unopened_doors = []
+        self.locked_doors = []
+        self.current_room = None
+        self.home = False
+        self.update_calls = 0
+
+        self.sprite_key = {'S': ShopKeep,
+                           'Ewb': WaddleBug,
+                           'Egl': GrimLeaper,
+                           'Eww': WaitWatch,
+                           'Egf': None,
+                           'Ezm': ZipperMouth,
+                           'Ch': Cherry,
+                           'Ba': Banana,
+                           'Me': Melon,
+                           'Gr': Grape,
+                           'Or': Orange,
+                           'Ap': Apple
+                           }
+
+        self.saved = sorted(set(vars(self)) - front_end - self.UNSAVED)     # State kept by keyframes
+
+    # Clock and input
+
+    def get_ticks(self):
+        """
+        Returns the logical time in milliseconds.
+        """
+        return self.ticks
+
+    def step(self, ms=TICK_MS):
+        """
+        Advances the logical clock, takes this tick's actions and updates the world once.
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.held, self.actions)
+        self.ticks += ms
+        for action in self.actions:
+            if action == INTERACT:
+                self.interact()
+            elif action == USE_POWER:
+                self.use_power()
+        self.actions = []
+        self.purchases = []
+        self.update()
+
+    def save_state(self):
+        """
+        Returns the state of the world as compressed bytes, for load_state to return to.
+        """
+        file = io.BytesIO()
+        StatePickler(file, self).dump({key: getattr(self, key) for key in self.saved})
+        return zlib.compress(file.getvalue())
+
+    def load_state(self, data):
+        """
+        Returns the world to a state saved by save_state. Rooms are rebuilt and pregenerated anew.
+        """
+        self.pregenerator.cancel()
+        self.room_cache.clear()
+        self.__dict__.update(StateUnpickler(io.BytesIO(zlib.decompress(data)), self).load())
+        self.pregenerator = RoomPregenerator(self)
+        self.passability = PassabilityGrid(self.loc)
+        self.flow_field = FlowField(self.passability)
+        self.vision = VisionTable(self.passability)
+        self.close_shop()
+
+    def is_pressed(self, direction):
+        """
+        Returns true if the given direction is held down, false otherwise.
+        """
+        return direction in self.held
+
+    def interact(self):
+        """
+        The player interacts with the tile they are facing.
+        """
+        self.player.check_facing_tile()
+
+    def use_power(self):
+        """
+        The player uses their power up, if they hold one.
+        """
+        if self.power_up != 0:
+            self.player.use_power()
+
+    # Presentation hooks, overridden by the front end
+
+    def load_sheet(self, sheet):
+        """
+        Returns the sprite sheet entities take their frame keys from.
+        """
+        return FrameSheet(sheet)
+
+    def draw(self):
+        """
+        Draws the world.
+        """
+
+    def clear_screen(self):
+        """
+        Blanks the screen between rooms.
+        """
+
+    def pause(self, ms):
+        """
+        Holds the current frame for a moment of logical time.
+        """
+        self.ticks += ms
+
+    def play_song(self, song):
+        """
+        Plays given song indefinitely.
+        """
+
+    def stop_music(self):
+        """
+        Stops the current song.
+        """
+
+    def play_sound(self, effect):
+        """
+        Plays given sound effect once.
+        """
+
+    def set_bg(self, new_bg):
+        """
+        Sets the background to the given image.
+        """
+
+    def request_bg(self, keyword):
+        """
+        Sets the background to the image matching the given keyword.
+        """
+
+    def intro_text(self):
+        """
+        Displays new-run flavor text.
+        """
+
+    def open_shop(self):
+        """
+        Returns a new shop object.
+        """
+        return None
+
+    def close_shop(self):
+        """
+        Lets go of the current room's shop.
+        """
+        self.shop = None
+
+    def trade(self):
+        """
+        Makes this tick's purchases, in place of the shop menu.
+        """
+        for purchase in self.purchases:
+            self.buy(*purchase)
+
+    def buy(self, cost_code, cost, ware):
+        """
+        Trades fruit for a ware if the player can afford it and holds no power up.
+        Returns true if the trade was made, false otherwise.
+        """
+        if self.recorder is not None:
+            self.recorder.record_purchase(cost_code, cost, ware)
+        bought = False
+        if self.fruit_count[cost_code] >= cost and self.power_up == 0:
+            self.set_fruit_count(cost_code, self.fruit_count[cost_code] - cost)
+            self.increment_fruit_count(cost_code)
+            self.set_power_up(ware)
+            bought = True
+        if self.fruit_count[6] == 4:
+            self.set_fruit_count(6, 0)
+            self.increment_total_lives()
+        return bought
+
+    def game_over(self):
+        """
+        Ends the game after the last life is lost.
+        """
+        self.playing = False
+
+    def victory(self):
+        """
+        Ends the game after the player escapes the dungeon.
+        """
+        self.playing = False
+
+    # World state
+
+    def set_current_location(self, new_loc):
+        """
+        Sets the player location to the given mapnode.
+        """
+        self.loc = new_loc
+
+    def increment_level(self):
+        """
+        Increments the game level by 1.
+        """
+        self.level += 1
+
+    def decrement_level(self):
+        """
+        Decrements the game level by 1.
+        """
+        self.level -= 1
+
+    def increment_depth(self):
+        """
+        Increments the depth (how many rooms deep the player is) by 1.
+        """
+        self.depth += 1
+
+    def decrement_depth(self):
+        """
+        Decrements the depth (how many rooms deep the player is) by 1.
+        """
+        self.depth -= 1
+
+    def increment_paths(self):
+        """
+        Increments the number of open paths by 1.
+        """
+        self.paths += 1
+
+    def decrement_paths(self):
+        """
+        Decrements the number of opened paths by 1.
+        """
+        self.paths -= 1
+
+    def increment_fruit_count(self, key):
+        """
+        Increments the count of a fruit.
+        """
+        self.fruit_count[key] += 1
+        self.hud_version += 1
+
+    def set_fruit_count(self, key, count):
+        """
+        Sets the count of a fruit.
+        """
+        self.fruit_count[key] = count
+        self.hud_version += 1
+
+    def set_power_up(self, power_up):
+        """
+        Sets the power up the player is holding.
+        """
+        self.power_up = power_up
+        self.hud_version += 1
+
+    def increment_current_lives(self):
+        """
+        Increments the number of lives the player has currently.
+        """
+        self.current_lives += 1
+        self.hud_version += 1
+
+    def increment_total_lives(self):
+        """
+        Increments the number of lives the player has at the start of a new game.
+        """
+        self.total_lives += 1
+
+    def decrement_current_lives(self):
+        """
+        Decrements the number of lives the player has currently.
+        """
+        self.current_lives -= 1
+        self.hud_version += 1
+
+    def add_to_visited(self, door):
+        """
+        Adds a door number to the visited array.
+        """
+        self.visited.append(door)
+
+    def reset(self, seed=None):
+        """
+        Resets key variables for a new game, seeding its randomness with the given seed or a new one.
+        """
+        self.seed = rd.getrandbits(64) if seed is None else seed
+        self.rng = rd.Random(self.seed)
+        self.player = None
+        self.current_lives = self.total_lives
+        self.visited = [0]
+        self.unvisited = 0
+        self.depth = 0
+        self.level = 0
+        self.paths = 0
+        self.unopened_doors = []
+        self.locked_doors = []
+        self.home = True
+        self.pregenerator.cancel()
+        self.room_cache.clear()
+        self.door_count = Sequence()
+        self.room_count = Sequence()
+        self.friend_eater = None
+        self.current_room = None
+        self.loc = None
+        self.close_shop()
+        self.power_up = False
+        self.hud_version += 1
+
+    def start(self):
+        """
+        Starts new game by creating new map tree and initial maps.
+        """
+        tree = level.start_tree()
+        context = level.GenerationContext(self, self.depth, self.rng.getrandbits(32))
+        node, player = level.generate_starting_maps(context)
+        context.apply(self)
+        tree.set_head(node)
+        self.load_room(tree.head, player)
+
+    def load_room(self, room, player):
+        """
+        Loads the current dungeon room.
+        """
+        self.friend_eater = None
+        self.poison.clear()
+        self.set_current_location(room)  # Set incoming as current location
+        room.clear_tile(player[0] + 1, player[1])  # Nothing stays on the player's spawn tile
+        self.build_map(room, player)  # Translate map data to sprites
+        self.player.invulnerable = True
+        self.player.invulnerability_timer = self.get_ticks() + 1000
+
+    def build_map(self, node, player):
+        """
+        Create the player at their spawn, then loop through map data and create corresponding sprites.
+        Ground and walls are collided against through the passability grid instead of becoming sprites.
+        """
+        self.passability = PassabilityGrid(node)
+        self.flow_field = FlowField(self.passability)
+        self.vision = VisionTable(self.passability)
+        self.player = Player(self, player[1], player[0] + 1)
+        for y, x, col in node.get_data().cells():  # Only tiles that are not plain floor
+            if isinstance(col, int):  # If number, create door
+                self.place_door(col, x, y)
+            elif col == 'B':
+                continue
+            elif col == 'Efe':
+                self.friend_eater = FriendEater(self, x, y)
+            else:  # Otherwise create sprite via sprite key
+                self.sprite_key[col](self, x, y)
+
+    def place_door(self, col, x, y):
+        """
+        Create door sprite.
+        """
+        if col in self.locked_doors:  # Locked door
+            Door(self, x, y, col, True, True)
+        elif col in self.unopened_doors:  # Unlocked unopened door
+            Door(self, x, y, col, False, True)
+        else:  # Unlocked opened door
+            Door(self, x, y, col, False, False)
+
+    def kill_map(self):
+        """
+        Kills all currently existing sprites.
+        """
+        for sprite in self.all_sprites:
+            sprite.kill()
+        for group in (self.all_sprites, self.all_items, self.all_doors, self.all_enemies, self.ticking,
+                      self.doors, self.enemies, self.attacks):
+            group.lostsprites.clear()   # Only Group.draw clears these, and the groups are never drawn
+
+    def update(self):
+        """
+        The game's core update function.
+        """
+        if self.is_victory():
+            return self.victory()
+        self.update_level()
+        if self.pregenerator.room is not self.loc:     # Room just loaded, level settled
+            self.pregenerator.schedule(self.loc)
+        if self.is_room_clear():
+            self.unlock_all_doors()
+            self.kill_all_enemies()
+        self.poison.expire(self.get_ticks())
+        self.update_calls = len(self.ticking)
+        self.ticking.update()
+        self.all_sprites.reindex(self.player, *self.all_enemies)
+        self.resolve_contacts()
+
+    def resolve_contacts(self):
+        """
+        Lets the sprites touching the player react to it, looking only at the player's spatial cells.
+        """
+        player = self.player
+        if self.poison.is_poisoned(player.rect) and not player.invulnerable:
+            self.play_sound(DAMAGE)
+            player.kill_player()
+            return
+        for sprite in self.all_sprites.query(player.rect):
+            if self.player is not player or not player.alive():     # Room reloaded or game over
+                return
+            if sprite is not player and sprite.alive() and hasattr(sprite, 'touch_player'):
+                sprite.touch_player()
+
+    def is_room_clear(self):
+        """
+        Returns true if the room is clear, false otherwise.
+        """
+        return self.loc.is_empty_fruit() and not self.loc.is_clear()
+
+    def is_victory(self):
+        """
+        Returns true if the game is won, false otherwise.
+        """
+        if self.depth == 101:
+            return True
+        return False
+
+    def unlock_all_doors(self):
+        """
+        Loops through all door sprites and makes them unlocked.
+        """
+        for door in self.all_doors:
+            door.unlock()
+
+    def kill_all_enemies(self):
+        """
+        Loops through all enemy sprites and removes them.
+        """
+        for enemy in self.all_enemies:
+            enemy.defeat()
+        self.pause(150)
+
+    def update_level(self):
+        """
+        Changes level background and music by player depth.
+        """
+        if self.home:  # Home room
+            self.stop_music()
+            self.intro_text()
+            self.set_bg(HOME)
+            self.play_song(OCEAN)
+            self.home = False
+        elif self.depth == 1 and self.level == 0:  # First room
+            self.new_level()
+        elif self.depth == PROG[self.level]:  # New level
+            self.new_level()
+        elif self.depth == REG[self.level]:  # Old level
+            self.old_level()
+
+    def new_level(self):
+        """
+        Changes the background and music to a new level.
+        """
+        self.request_bg(BACKGROUND[self.level])
+        self.play_song(MUSIC[self.level])
+        self.increment_level()
+
+    def old_level(self):
+        """
+        Changes the background and music to an old level.
+        """
+        self.request_bg(BACKGROUND[self.level - 2])
+        self.play_song(MUSIC[self.level - 2])
+        self.decrement_level()
+
+    def player_death(self):
+        """
+        Subtract life and respawn player, else end game.
+        """
+        self.decrement_current_lives()
+        self.kill_map()
+        self.clear_screen()
+        if self.current_lives == 0:
+            self.game_over()
+        else:
+            self.player.invulnerable = True
+            self.player.invulnerability_timer = self.get_ticks() + 1000
+            self.load_room(self.loc, (self.loc.get_data().rows // 2, self.loc.get_data().columns // 2))
+
+    def traverse(self, door):
+        """
+        Travel into a new dungeon room.
+        """
+        self.kill_map()
+        self.clear_screen()
+        if self.recorder is not None:
+            self.recorder.enter_room()
+        node = self.loc.bridges[door].get_node()  # Get target room
+        self.update_depth(node)
+        self.play_sound(DOOR)
+        player = self.loc.bridges[door].get_spawn()  # Get player spawn coordinate
+        self.player.movement_delay = self.get_ticks() + 2000
+        self.close_shop()
+        self.load_room(node, player)
+
+    def update_depth(self, node):
+        """
+        Update player depth
+        """
+        if node.num not in self.visited:  # New depth
+            self.depth += 1
+            node = self.pregenerator.generate_next_maps(node)
+            self.add_to_visited(node.num)
+        elif node.num in self.visited and self.loc.get_num() < node.get_num():  # Depth reachieved
+            self.increment_depth()
+        else:  # Backtracking
+            self.decrement_depth()
@@ -0,0 +1,98 @@
+from config import *
+
+
+class SpatialGroup(pygame.sprite.LayeredUpdates):
+    """
+    Layered sprite group that also buckets its sprites into a uniform grid of cells,
+    so the sprites inside an area can be found without scanning the whole group.
+    """
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}             # (row, column) cell -> set of sprites
+        self.sprite_cells = {}      # Sprite -> cells it is bucketed in
+        self.pending = set()        # Sprites added before they had a rect
+        self.order = {}             # Sprite -> insertion number, keeps draw order within a layer
+        self.sequence = 0          # Insertion number of the next sprite
+        super().__init__()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['cells'] = {}             # Rebuilt from the rects on the next query
+        state['sprite_cells'] = {}
+        state['pending'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pending = set(self.spritedict)
+
+    def add_internal(self, sprite, layer=None):
+        """
+        Adds a sprite to the group. It is bucketed once it has a rect.
+        """
+        super().add_internal(sprite, layer)
+        self.order[sprite] = self.sequence
+        self.sequence += 1
+        self.pending.add(sprite)
+
+    def remove_internal(self, sprite):
+        """
+        Removes a sprite from the group and its cells.
+        """
+        super().remove_internal(sprite)
+        del self.order[sprite]
+        self.pending.discard(sprite)
+        for cell in self.sprite_cells.pop(sprite, ()):
+            self.cells[cell].discard(sprite)
+
+    def get_cells(self, rect):
+        """
+        Returns the cells touched by the given rect.
+        """
+        size = self.cell_size
+        return tuple((row, col)
+                     for row in range(rect.top // size, (rect.bottom - 1) // size + 1)
+                     for col in range(rect.left // size, (rect.right - 1) // size + 1))
+
+    def reindex(self, *sprites):
+        """
+        Moves the given sprites into the cells matching their current rects.
+        """
+        for sprite in sprites:
+            old = self.sprite_cells.get(sprite)
+            if old is None:
+                continue
+            new = self.get_cells(sprite.rect)
+            if new == old:
+                continue
+            for cell in old:
+                self.cells[cell].discard(sprite)
+            self.bucket(sprite, new)
+
+    def bucket(self, sprite, cells):
+        """
+        Places a sprite in the given cells.
+        """
+        self.sprite_cells[sprite] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(sprite)
+
+    def flush(self):
+        """
+        Buckets sprites that were added before their rect was set.
+        """
+        for sprite in self.pending:
+            self.bucket(sprite, self.get_cells(sprite.rect))
+        self.pending.clear()
+
+    def query(self, rect):
+        """
+        Returns the sprites colliding with the given rect, in draw order.
+        """
+        self.flush()
+        found = set()
+        for cell in self.get_cells(rect):
+            found.update(self.cells.get(cell, ()))
+        hits = [sprite for sprite in found if rect.colliderect(sprite.rect)]
+        hits.sort(key=lambda sprite: (self._spritelayers[sprite], self.order[sprite]))
+        return hits
@@ -1,15 +1,62 @@
 from config import *
-import random as rd
+from collision import tiles_under
 
 
-class SpriteSheet:
+class FrameSheet:
+    """
+    Names the frames of a sprite sheet without loading it. Entities hold frame keys rather
+    than surfaces, so the game can run without a display.
+    """
     def __init__(self, sheet):
-        self.sheet = pygame.image.load(sheet).convert()
+        self.name = sheet
 
     def get_sprite(self, x, y, width, height):
-        sprite = pygame.Surface([width, height])
+        """
+        Returns the key of the frame at the given area of the sheet.
+        """
+        return self.name, x, y, width, height
+
+
+class SpriteSheet(FrameSheet):
+    """
+    Loads a sprite sheet and slices it into a table of shared frames.
+    """
+    def __init__(self, sheet):
+        super().__init__(sheet)
+        self.sheet = pygame.image.load(sheet).convert()
+        self.frames = {}    # (x, y, width, height) -> frame
+        self.hits = 0
+        self.misses = 0
+        self.slice_frames(TILE_SIZE, TILE_SIZE)
+
+    def slice_frames(self, width, height):
+        """
+        Slices the whole sheet into frames of the given size.
+        """
+        for y in range(0, self.sheet.get_height() - height + 1, height):
+            for x in range(0, self.sheet.get_width() - width + 1, width):
+                self.frames[(x, y, width, height)] = self.cut_sprite(x, y, width, height)
+
+    def cut_sprite(self, x, y, width, height):
+        """
+        Returns a new colorkeyed surface copied from the given area of the sheet.
+        """
+        sprite = pygame.Surface([width, height]).convert()
         sprite.blit(self.sheet, (0, 0), (x, y, width, height))
-        sprite.set_colorkey(NASTY_GREEN)
+        sprite.set_colorkey(NASTY_GREEN, pygame.RLEACCEL)
+        return sprite
+
+    def get_frame(self, x, y, width, height):
+        """
+        Returns the shared frame for the given area of the sheet.
+        """
+        key = (x, y, width, height)
+        sprite = self.frames.get(key)
+        if sprite is None:
+            self.misses += 1
+            sprite = self.frames[key] = self.cut_sprite(x, y, width, height)
+        else:
+            self.hits += 1
         return sprite
 
 
@@ -22,7 +69,7 @@ class Player(pygame.sprite.Sprite):
         # Fundamental variables
         self.game = game
         self._layer = PLAYER_LAYER
-        self.groups = self.game.all_sprites
+        self.groups = self.game.all_sprites, self.game.ticking
         self.width = TILE_SIZE
         self.height = TILE_SIZE
         self.image = self.game.character_sheet.get_sprite(0, 0, self.width, self.height)
@@ -31,11 +78,9 @@ class Player(pygame.sprite.Sprite):
         # Movement and size variables
         self.x = x * TILE_SIZE
         self.y = y * TILE_SIZE
-        self.rel_x = self.x
-        self.rel_y = self.y
         self.x_change = 0
         self.y_change = 0
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -82,9 +127,9 @@ class Player(pygame.sprite.Sprite):
         self.check_feet()   # Player checks the ground at their current coordinate
         self.check_invulnerability()
         if self.movement_start == self.movement_end:    # No current movement
-            # Reset variables from previous movement; update player relative coordinate
-            self.rel_x += self.x_change
-            self.rel_y += self.y_change
+            # Reset variables from previous movement; update player tile coordinate
+            self.x += self.x_change
+            self.y += self.y_change
             self.movement_start, self.movement_end = 0, 0
             self.x_change, self.y_change = 0, 0
 
@@ -102,16 +147,16 @@ class Player(pygame.sprite.Sprite):
         """
         Monitors the players invulnerability status.
         """
-        if self.invulnerability_timer < pygame.time.get_ticks():
+        if self.invulnerability_timer < self.game.get_ticks():
             self.invulnerable = False
 
     def cancel_movement(self):
         """
         Cancel attempted player move.
         """
-        if self.sound_delay < pygame.time.get_ticks():
-            self.sound_delay = pygame.time.get_ticks() + 320
-            pygame.mixer.Sound.play(WALL)
+        if self.sound_delay < self.game.get_ticks():
+            self.sound_delay = self.game.get_ticks() + 320
+            self.game.play_sound(WALL)
         self.x_change, self.y_change = 0, 0
         self.movement_end -= PLAYER_SPEED
 
@@ -137,18 +182,17 @@ class Player(pygame.sprite.Sprite):
         Detects arrow input and adjusts x/y change variables.
         If no input, resets player animation to stationary.
         """
-        keys = pygame.key.get_pressed()
         self.movement_end += PLAYER_SPEED
-        if keys[pygame.K_LEFT]:
+        if self.game.is_pressed(LEFT):
             self.x_change -= PLAYER_SPEED
             self.facing = LEFT
-        elif keys[pygame.K_RIGHT]:
+        elif self.game.is_pressed(RIGHT):
             self.x_change += PLAYER_SPEED
             self.facing = RIGHT
-        elif keys[pygame.K_DOWN]:
+        elif self.game.is_pressed(DOWN):
             self.y_change += PLAYER_SPEED
             self.facing = DOWN
-        elif keys[pygame.K_UP]:
+        elif self.game.is_pressed(UP):
             self.y_change -= PLAYER_SPEED
             self.facing = UP
         else:
@@ -160,15 +204,9 @@ class Player(pygame.sprite.Sprite):
         Returns true if collision detected, false otherwise.
         """
         if direction == 'x':
-            self.rect.x += self.x_change
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.x -= self.x_change
-            return True if hits else False
+            return self.game.passability.is_blocked(self.rect.move(self.x_change, 0))
         if direction == 'y':
-            self.rect.y += self.y_change
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.y -= self.y_change
-            return True if hits else False
+            return self.game.passability.is_blocked(self.rect.move(0, self.y_change))
 
     def animate_movement(self):
         """
@@ -187,23 +225,11 @@ class Player(pygame.sprite.Sprite):
         elif self.facing == RIGHT:
             self.move_right()
 
-    def center_camera(self, dir, amount):
-        """
-        Adjusts camera to stay centered on player.
-        """
-        if dir == 'x':
-            for sprite in self.game.all_sprites:
-                sprite.rect.x += amount
-        elif dir == 'y':
-            for sprite in self.game.all_sprites:
-                sprite.rect.y += amount
-
     def move_down(self):
         """
         Animates player down movement.
         """
         self.rect.y += self.speed
-        self.center_camera('y', -1 * self.speed)
         if self.movement_start == 16:
             self.animation_loop += 1
             self.image = self.down_animations[self.animation_loop]
@@ -213,7 +239,6 @@ class Player(pygame.sprite.Sprite):
         Animates player up movement.
         """
         self.rect.y -= self.speed
-        self.center_camera('y', self.speed)
         if self.movement_start == 16:
             self.animation_loop += 1
             self.image = self.up_animations[self.animation_loop]
@@ -223,7 +248,6 @@ class Player(pygame.sprite.Sprite):
         Animates player left movement.
         """
         self.rect.x -= self.speed
-        self.center_camera('x', self.speed)
         if self.movement_start == 16:
             self.animation_loop += 1
             self.image = self.left_animations[self.animation_loop]
@@ -233,7 +257,6 @@ class Player(pygame.sprite.Sprite):
         Animates player right movement.
         """
         self.rect.x += self.speed
-        self.center_camera('x', -1 * self.speed)
         if self.movement_start == 16:
             self.animation_loop += 1
             self.image = self.right_animations[self.animation_loop]
@@ -242,16 +265,15 @@ class Player(pygame.sprite.Sprite):
         """
         Looks for items at player coordinate.
         """
-        if self.game.loc.data[self.rel_y//32][self.rel_x//32] in ITEM_CODES:
-            self.game.loc.data[self.rel_y//32][self.rel_x//32] = '.'
-            self.game.loc.fruit -= 1
+        if self.game.loc.get_data().get(self.y//32, self.x//32) in ITEM_CODES:
+            self.game.loc.eat(self.y//32, self.x//32)
 
     def check_facing_tile(self):
         """
         Attempts to interact with the tile the player is facing.
         """
         tile = self.get_facing_tile()
-        if self.game.loc.data[tile[0]//32][tile[1]//32] == 'S':
+        if self.game.loc.get_data().get(tile[0]//32, tile[1]//32) == 'S':
             if self.game.shop is None:
                 self.game.shop = self.game.open_shop()
             self.game.trade()
@@ -261,13 +283,13 @@ class Player(pygame.sprite.Sprite):
         Returns the coordinates of the tile the player is facing.
         """
         if self.facing == UP:
-            return self.rel_y - 32, self.rel_x
+            return self.y - 32, self.x
         elif self.facing == DOWN:
-            return self.rel_y + 32, self.rel_x
+            return self.y + 32, self.x
         elif self.facing == RIGHT:
-            return self.rel_y, self.rel_x + 32
+            return self.y, self.x + 32
         elif self.facing == LEFT:
-            return self.rel_y, self.rel_x - 32
+            return self.y, self.x - 32
 
     def use_power(self):
         """
@@ -275,15 +297,15 @@ class Player(pygame.sprite.Sprite):
         """
         if self.game.power_up == 7:     # Ice cream - fruit multiplier
             for key in self.game.fruit_count:
-                self.game.fruit_count[key] = self.game.fruit_count[key] * 2
+                self.game.set_fruit_count(key, self.game.fruit_count[key] * 2)
         elif self.game.power_up == 8:   # Drink - eats all the fruit
             for fruit in self.game.all_items:
                 fruit.eat_without_touch()
-        elif self.game.power_up == 9 and self.game.lives != 5:   # Candy - add a life
-            self.game.lives += 1
+        elif self.game.power_up == 9 and self.game.current_lives != 5:   # Candy - add a life
+            self.game.increment_current_lives()
         else:
             self.game.play_sound(ERROR)
-        self.game.power_up = 0
+        self.game.set_power_up(0)
 
     def kill_player(self):
         """
@@ -291,7 +313,7 @@ class Player(pygame.sprite.Sprite):
         """
         self.image = self.game.character_sheet.get_sprite(128, 0, self.width, self.height)
         self.game.draw()
-        pygame.time.delay(2000)
+        self.game.pause(2000)
         self.game.player_death()
 
     def use_door(self, door):
@@ -311,7 +333,7 @@ class NPC(pygame.sprite.Sprite):
     """
     def __init__(self, game):
         self.game = game
-        self.groups = self.game.all_sprites, self.game.blocks
+        self.groups = self.game.all_sprites, self.game.ticking
         self.animation_loop = 0
         pygame.sprite.Sprite.__init__(self, self.groups)
 
@@ -328,10 +350,9 @@ class ShopKeep(NPC):
         self.height = TILE_SIZE
 
         self.image = self.game.npc_sheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
         self.animation_loop = 0
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -360,29 +381,29 @@ class Enemy(pygame.sprite.Sprite):
     """
     def __init__(self, game):
         self.game = game
-        self.groups = self.game.all_sprites, self.game.all_enemies
+        self.groups = self.game.all_sprites, self.game.all_enemies, self.game.ticking
         self.x_change = 0
         self.y_change = 0
         self.animation_loop = 0
         self.movement_delay = 0
         pygame.sprite.Sprite.__init__(self, self.groups)
 
-    def collide_player(self):
+    def touch_player(self):
         """
-        If enemy hits player, kill player.
+        Enemy touched the player; kill player unless invulnerable.
         """
-        if self.is_hitting_player() and self.game.player.invulnerable:
+        if self.game.player.invulnerable:
             self.game.play_sound(SAFE)
-
-        if self.is_hitting_player() and not self.game.player.invulnerable:
+        else:
             self.game.play_sound(DAMAGE)
             self.game.player.kill_player()
 
-    def is_hitting_player(self):
+    def collide_block(self):
         """
-        Returns true if hit player, false otherwise.
+        Detects if the enemy would hit a block at the end of its current movement.
         """
-        return pygame.sprite.collide_rect(self.game.player, self)
+        dx, dy = DIRECTION_VECTORS[self.facing]
+        return self.game.passability.is_blocked(self.rect.move(dx * self.movement_end, dy * self.movement_end))
 
 
 class WaddleBug(Enemy):
@@ -399,16 +420,15 @@ class WaddleBug(Enemy):
         self.height = TILE_SIZE
 
         self.image = self.game.enemy_sheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
         self.movement_start = 0
         self.movement_end = 0
         self.speed = 1
-        self.type = rd.choice(['HORIZONTAL', 'VERTICAL'])
+        self.type = self.game.rng.choice(['HORIZONTAL', 'VERTICAL'])
         if self.type == 'HORIZONTAL':
             self.facing = DOWN
         elif self.type == 'VERTICAL':
@@ -447,7 +467,6 @@ class WaddleBug(Enemy):
         """
         Update WaddleBug.
         """
-        self.collide_player()
         if self.movement_start == self.movement_end:
             self.movement_start, self.movement_end = 0, 0
             self.movement_end = TILE_SIZE
@@ -470,29 +489,6 @@ class WaddleBug(Enemy):
         elif self.facing == UP:
             self.facing = DOWN
 
-    def collide_block(self):
-        """
-        Detects if WaddleBug has collided with block.
-        """
-        hits = None
-        if self.facing == UP:
-            self.rect.y -= self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.y += self.movement_end
-        elif self.facing == DOWN:
-            self.rect.y += self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.y -= self.movement_end
-        elif self.facing == RIGHT:
-            self.rect.x += self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.x -= self.movement_end
-        elif self.facing == LEFT:
-            self.rect.x -= self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.x += self.movement_end
-        return True if hits else False
-
     def animate_movement(self):
         """
         Animate WaddleBug movement.
@@ -587,9 +583,8 @@ class GrimLeaper(Enemy):
         self.height = TILE_SIZE
 
         self.image = self.game.enemy_sheet.get_sprite(0, 96, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -622,8 +617,7 @@ class GrimLeaper(Enemy):
         """
         Update GrimLeaper.
         """
-        self.collide_player()
-        if int(self.movement_start) == self.movement_end and self.movement_delay < pygame.time.get_ticks():
+        if int(self.movement_start) == self.movement_end and self.movement_delay < self.game.get_ticks():
             self.movement_start, self.movement_end, self.movement_delay = 0, 64, 0
             self.change_direction()
             if self.collide_block():  # If no collision, animate movement
@@ -631,14 +625,14 @@ class GrimLeaper(Enemy):
         elif self.movement_start != self.movement_end:
             self.animate_movement()
             if self.movement_start == self.movement_end:
-                self.movement_delay = pygame.time.get_ticks() + 1000
+                self.movement_delay = self.game.get_ticks() + 1000
                 self.stationary()
 
     def change_direction(self):
         """
         Randomly select a new direction for GrimLeaper
         """
-        i = int(rd.random() * len(self.directions))
+        i = int(self.game.rng.random() * len(self.directions))
         self.facing = self.directions[i]
 
     def stationary(self):
@@ -654,29 +648,6 @@ class GrimLeaper(Enemy):
         elif self.facing == RIGHT:
             self.image = self.game.enemy_sheet.get_sprite(96, 96, self.width, self.height)
 
-    def collide_block(self):
-        """
-        Detects if GrimLeaper has collided with block.
-        """
-        hits = None
-        if self.facing == UP:
-            self.rect.y -= self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.y += self.movement_end
-        elif self.facing == DOWN:
-            self.rect.y += self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.y -= self.movement_end
-        elif self.facing == RIGHT:
-            self.rect.x += self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.x -= self.movement_end
-        elif self.facing == LEFT:
-            self.rect.x -= self.movement_end
-            hits = pygame.sprite.spritecollide(self, self.game.blocks, False)
-            self.rect.x += self.movement_end
-        return True if hits else False
-
     def animate_movement(self):
         """
         Animate GrimLeaper movement.
@@ -759,9 +730,8 @@ class WaitWatch(Enemy):
         self.height = TILE_SIZE
 
         self.image = self.game.enemy_sheet.get_sprite(0, 160, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -800,36 +770,35 @@ class WaitWatch(Enemy):
         """
         Update WaitWatch
         """
-        self.collide_player()
         if self.in_eyeshot():
             self.image = self.evil_face
             return
 
-        if int(self.movement_start) == self.movement_end and self.movement_delay < pygame.time.get_ticks():
+        if int(self.movement_start) == self.movement_end and self.movement_delay < self.game.get_ticks():
             self.movement_start, self.movement_end, self.movement_delay = 0, 32, 0
             self.change_direction()
 
             if self.collide_block():  # If no collision, animate movement
                 self.movement_start, self.movement_end, self.movement_delay = 0, 0, 0
 
-            seed = int(rd.random() * 100)
+            seed = int(self.game.rng.random() * 100)
             if seed > 50:
                 self.movement_start, self.movement_end = 0, 0
-                self.movement_delay = pygame.time.get_ticks() + 3000
+                self.movement_delay = self.game.get_ticks() + 3000
                 self.stationary()
 
         elif self.movement_start != self.movement_end:
             self.watching = False
             self.animate_movement()
             if self.movement_start == self.movement_end:
-                self.movement_delay = pygame.time.get_ticks() + 3000
+                self.movement_delay = self.game.get_ticks() + 3000
                 self.stationary()
 
     def change_direction(self):
         """
         Randomly select a new direction for WaitWatch
         """
-        i = int(rd.random() * len(self.directions))
+        i = int(self.game.rng.random() * len(self.directions))
         self.facing = self.directions[i]
 
     def stationary(self):
@@ -852,35 +821,6 @@ class WaitWatch(Enemy):
         """
         return self.watching
 
-    def collide_block(self):
-        """
-        Detects if GrimLeaper has collided with block.
-        """
-        hits = None
-        if self.facing == UP:
-            self.rect.y -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y += self.movement_end
-        elif self.facing == DOWN:
-            self.rect.y += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y -= self.movement_end
-        elif self.facing == RIGHT:
-            self.rect.x += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x -= self.movement_end
-        elif self.facing == LEFT:
-            self.rect.x -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x += self.movement_end
-        return True if hits else False
-
-    def collision(self, object):
-        """
-        Returns true if collision, false otherwise.
-        """
-        return pygame.sprite.spritecollide(self, object, False)
-
     def animate_movement(self):
         """
         Animate WaitWatch's movement.
@@ -940,33 +880,21 @@ class WaitWatch(Enemy):
         Returns true if the player is in WaitWatch's eyeshot, false otherwise.
         """
         if self.watching:
-            if self.facing == DOWN:
-                return self.see_player('y', 32)
-            elif self.facing == UP:
-                return self.see_player('y', -32)
-            elif self.facing == LEFT:
-                return self.see_player('x', -32)
-            elif self.facing == RIGHT:
-                return self.see_player('x', 32)
+            return self.see_player()
         return False
 
-    def see_player(self, direction, amount):
+    def see_player(self):
         """
         Returns true if WaitWatch can see the player, false otherwise.
+        On sight, WaitWatch lunges onto the nearest tile it sees the player on.
         """
-        if direction == 'x':
-            for tile in range(1, 6):
-                self.rect.x += tile * amount
-                if self.is_hitting_player():
-                    return True
-                self.rect.x -= tile * amount
-        if direction == 'y':
-            for tile in range(1, 6):
-                self.rect.y += tile * amount
-                if self.is_hitting_player():
-                    return True
-                self.rect.y -= tile * amount
-        return False
+        visible = self.game.vision.get_visible((self.rect.y // TILE_SIZE, self.rect.x // TILE_SIZE), self.facing)
+        seen = [visible[tile] for tile in tiles_under(self.game.player.rect) if tile in visible]
+        if len(seen) == 0:
+            return False
+        dx, dy = DIRECTION_VECTORS[self.facing]
+        self.rect.move_ip(dx * min(seen) * TILE_SIZE, dy * min(seen) * TILE_SIZE)
+        return True
 
     def defeat(self):
         """
@@ -991,13 +919,9 @@ class FriendEater(Enemy):
         self.width = TILE_SIZE
         self.height = TILE_SIZE
 
-        self.rel_x = self.x
-        self.rel_y = self.y
-
         self.image = self.game.enemy_sheet.get_sprite(0, 288, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1036,17 +960,16 @@ class FriendEater(Enemy):
         """
         Update FriendEater
         """
-        self.collide_player()
-        if self.movement_start == self.movement_end and self.movement_delay < pygame.time.get_ticks():
-            self.movement_start, self.movement_end, self.movement_delay = 0, 32 * int(rd.random() * 5), 0
+        self.game.poison.spread(self.rect, self.game.get_ticks())
+        if self.movement_start == self.movement_end and self.movement_delay < self.game.get_ticks():
+            self.movement_start, self.movement_end, self.movement_delay = 0, 32 * int(self.game.rng.random() * 5), 0
             if self.collide_block():  # If no collision, animate movement
                 self.movement_start, self.movement_end, self.movement_delay = 0, 0, 0
                 self.change_direction()
         elif self.movement_start != self.movement_end:
             self.animate_movement()
             if self.movement_start == self.movement_end:
-                self.update_relative_pos()
-                self.movement_delay = pygame.time.get_ticks() + 1000
+                self.movement_delay = self.game.get_ticks() + 1000
                 self.stationary()
                 self.change_direction()
 
@@ -1054,38 +977,9 @@ class FriendEater(Enemy):
         """
         Randomly select a new direction for FriendEater
         """
-        i = int(rd.random() * len(self.directions))
+        i = int(self.game.rng.random() * len(self.directions))
         self.facing = self.directions[i]
 
-    def collide_block(self):
-        """
-        Detects if FriendEater has collided with block.
-        """
-        hits = None
-        if self.facing == UP:
-            self.rect.y -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y += self.movement_end
-        elif self.facing == DOWN:
-            self.rect.y += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y -= self.movement_end
-        elif self.facing == RIGHT:
-            self.rect.x += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x -= self.movement_end
-        elif self.facing == LEFT:
-            self.rect.x -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x += self.movement_end
-        return True if hits else False
-
-    def collision(self, object):
-        """
-        Return true if collsion, false otherwise.
-        """
-        return pygame.sprite.spritecollide(self, object, False)
-
     def animate_movement(self):
         """
         Animate FriendEater movement.
@@ -1169,19 +1063,6 @@ class FriendEater(Enemy):
             self.image = self.right_animations[0]
         self.rect.x += self.speed
 
-    def update_relative_pos(self):
-        """
-        Updates FriendEater's relative position.
-        """
-        if self.facing == UP:
-            self.rel_y -= 32
-        elif self.facing == DOWN:
-            self.rel_y += 32
-        elif self.facing == RIGHT:
-            self.rel_x += 32
-        elif self.facing == LEFT:
-            self.rel_x -= 32
-
     def defeat(self):
         """
         Remove FriendEater from screen.
@@ -1205,13 +1086,9 @@ class ZipperMouth(Enemy):
         self.width = TILE_SIZE
         self.height = TILE_SIZE
 
-        self.rel_x = self.x
-        self.rel_y = self.y
-
         self.image = self.game.enemy_sheet.get_sprite(0, 384, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1253,48 +1130,17 @@ class ZipperMouth(Enemy):
         """
         Update ZipperMouth
         """
-        self.collide_player()
-        if self.movement_start == self.movement_end and self.movement_delay < pygame.time.get_ticks():
+        if self.movement_start == self.movement_end and self.movement_delay < self.game.get_ticks():
             self.movement_start, self.movement_end, self.movement_delay = 0, 32, 0
             if self.collide_block():  # If no collision, animate movement
                 self.movement_start, self.movement_end, self.movement_delay = 0, 0, 0
         elif self.movement_start != self.movement_end:
             self.animate_movement()
             if self.movement_start == self.movement_end:
-                self.update_relative_pos()
                 self.stationary()
                 self.target = self.get_player_location()
                 self.facing = self.get_next_direction()
 
-    def collide_block(self):
-        """
-        Detects if ZipperMouth has collided with block.
-        """
-        hits = None
-        if self.facing == UP:
-            self.rect.y -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y += self.movement_end
-        elif self.facing == DOWN:
-            self.rect.y += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.y -= self.movement_end
-        elif self.facing == RIGHT:
-            self.rect.x += self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x -= self.movement_end
-        elif self.facing == LEFT:
-            self.rect.x -= self.movement_end
-            hits = self.collision(self.game.blocks)
-            self.rect.x += self.movement_end
-        return True if hits else False
-
-    def collision(self, object):
-        """
-        Return true if collision, false otherwise
-        """
-        return pygame.sprite.spritecollide(self, object, False)
-
     def animate_movement(self):
         """
         Animate ZipperMouth movement.
@@ -1378,30 +1224,26 @@ class ZipperMouth(Enemy):
             self.image = self.right_animations[0]
         self.rect.x += self.speed
 
-    def update_relative_pos(self):
-        """
-        Updates ZipperMouth's relative position.
-        """
-        if self.facing == UP:
-            self.rel_y -= 32
-        elif self.facing == DOWN:
-            self.rel_y += 32
-        elif self.facing == RIGHT:
-            self.rel_x += 32
-        elif self.facing == LEFT:
-            self.rel_x -= 32
-
     def get_player_location(self):
         """
         Returns the player's current location.
         """
-        return self.game.player.rel_y // 32, self.game.player.rel_x // 32
+        return self.game.player.y // 32, self.game.player.x // 32
 
     def get_next_direction(self):
         """
-        Returns ZipperMouth's next direction based on where the player is currently.
+        Returns ZipperMouth's next direction, following the shortest walkable path to the player.
+        """
+        curr = self.rect.y // 32, self.rect.x // 32
+        possible = self.game.flow_field.get_steps(curr, self.target)
+        if len(possible) > 0:
+            return self.game.rng.choice(possible)
+        return self.get_direct_direction(curr)
+
+    def get_direct_direction(self, curr):
+        """
+        Returns ZipperMouth's next direction straight toward the player, for when no path reaches them.
         """
-        curr = self.rel_y // 32, self.rel_x // 32
         possible = []
         if self.target[0] > curr[0]:
             possible.append(DOWN)
@@ -1413,7 +1255,7 @@ class ZipperMouth(Enemy):
             possible.append(LEFT)
 
         if len(possible) > 0:
-            return rd.choice(possible)
+            return self.game.rng.choice(possible)
         return DOWN
 
     def defeat(self):
@@ -1426,88 +1268,6 @@ class ZipperMouth(Enemy):
         self.game.friend_eater = None
 
 
-class Block(pygame.sprite.Sprite):
-    """
-    Represents a non-player area.
-    """
-    def __init__(self, game, x, y):
-        self.game = game
-        self._layer = BLOCK_LAYER
-        self.groups = self.game.all_sprites, self.game.blocks
-        pygame.sprite.Sprite.__init__(self, self.groups)
-
-        self.x = x * TILE_SIZE
-        self.y = y * TILE_SIZE
-        self.width = TILE_SIZE
-        self.height = TILE_SIZE
-
-        self.image = pygame.Surface([self.width, self.height])
-        self.image.fill(BLACK)
-
-        self.rect = self.image.get_rect()
-        self.rect.x = self.x
-        self.rect.y = self.y
-
-
-class Ground(pygame.sprite.Sprite):
-    """
-    Represents a tile the player can walk.
-    """
-    def __init__(self, game, x, y):
-        self.game = game
-        self._layer = GROUND_LAYER
-        self.groups = self.game.all_sprites, self.game.ground
-        pygame.sprite.Sprite.__init__(self, self.groups)
-
-        self.x = x * TILE_SIZE
-        self.y = y * TILE_SIZE
-        self.width = TILE_SIZE
-        self.height = TILE_SIZE
-
-        self.image = self.game.terrain_sheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
-
-        self.rect = self.image.get_rect()
-        self.rect.x = self.x
-        self.rect.y = self.y
-        self.poisoned = False
-        self.poisoned_timer = 0
-
-    def update(self):
-        """
-        Update the ground sprite.
-        """
-        if self.is_hitting_friendeater() and self.poisoned is False:
-            self.image = self.game.terrain_sheet.get_sprite(32, 0, self.width, self.height)
-            self.poisoned = True
-            self.poisoned_timer = pygame.time.get_ticks() + 5000
-        elif self.poisoned_timer < pygame.time.get_ticks() and self.poisoned is True:
-            self.image = self.game.terrain_sheet.get_sprite(0, 0, self.width, self.height)
-            self.poisoned = False
-        if self.is_hitting_player() and self.is_poisoned() and self.game.player.invulnerable is False:
-            self.game.play_sound(DAMAGE)
-            self.game.player.kill_player()
-
-    def is_hitting_friendeater(self):
-        """
-        Returns true if collision with friendeater, false otherwise
-        """
-        if isinstance(self.game.friend_eater, pygame.sprite.Sprite):
-            return pygame.sprite.collide_rect(self.game.friend_eater, self)
-
-    def is_hitting_player(self):
-        """
-        Returns true if collision with player, false otherwise
-        """
-        return pygame.sprite.collide_rect(self.game.player, self)
-
-    def is_poisoned(self):
-        """
-        Returns true if ground is poisoned.
-        """
-        return self.poisoned
-
-
 class Door(pygame.sprite.Sprite):
     """
     Represents a dungeon door.
@@ -1532,22 +1292,15 @@ class Door(pygame.sprite.Sprite):
         else:   # used doors
             self.image = self.game.door_sheet.get_sprite(32, 0, self.width, self.height)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
-    def update(self):
-        """
-        Update door
-        """
-        if self.is_hitting_player():
-            self.game.player.use_door(self.number)
-
-    def is_hitting_player(self):
+    def touch_player(self):
         """
-        Returns true if hitting player, else false.
+        Player walked into the door.
         """
-        return pygame.sprite.collide_rect(self.game.player, self)
+        self.game.player.use_door(self.number)
 
     def unlock(self):
         """
@@ -1574,21 +1327,22 @@ class Item(pygame.sprite.Sprite):
         self.groups = self.game.all_sprites, self.game.all_items
         pygame.sprite.Sprite.__init__(self, self.groups)
 
-    def update(self):
+    def touch_player(self):
+        """
+        Player walked over the item.
+        """
         self.eat()
 
     def eat(self):
-        hits = pygame.sprite.collide_rect(self.game.player, self)
-        if hits:
-            pygame.mixer.Sound.play(EAT)
-            self.kill()
-            self.game.fruit_count[self.code] += 1
+        self.game.play_sound(EAT)
+        self.kill()
+        self.game.increment_fruit_count(self.code)
 
     def eat_without_touch(self):
-        pygame.mixer.Sound.play(EAT)
+        self.game.play_sound(EAT)
         self.kill()
-        self.game.fruit_count[self.code] += 1
-        self.game.loc.fruit -= 1
+        self.game.increment_fruit_count(self.code)
+        self.game.loc.eat(self.rect.y // TILE_SIZE, self.rect.x // TILE_SIZE)
 
 
 class Cherry(Item):
@@ -1606,9 +1360,8 @@ class Cherry(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1630,9 +1383,8 @@ class Banana(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(32, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1654,9 +1406,8 @@ class Melon(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(64, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1678,9 +1429,8 @@ class Grape(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(96, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1702,9 +1452,8 @@ class Orange(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(128, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -1726,9 +1475,8 @@ class Apple(Item):
         self.height = TILE_SIZE
 
         self.image = self.game.items_sheet.get_sprite(160, 0, self.width, self.height)
-        self.image.set_colorkey(NASTY_GREEN)
 
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.x = self.x
         self.rect.y = self.y
 
@@ -0,0 +1,20 @@
+import random as rd
+from simulation import *
+
+
+def test_passability_matches_tile_collision():
+    sim = Simulation()
+    sim.reset(7)
+    sim.start()
+    sim.pregenerator.cancel()
+    grid = sim.loc.get_data()
+    passability = PassabilityGrid(sim.loc)
+    blocks = [pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+              for row in range(grid.rows) for col in range(grid.columns) if grid.get(row, col) in BLOCKING_TILES]
+    assert any(tile in BLOCKING_TILES for row, col, tile in grid.cells())     # The shop keeper
+
+    drive = rd.Random(7)
+    width, height = grid.columns * TILE_SIZE, grid.rows * TILE_SIZE
+    for i in range(2000):
+        rect = pygame.Rect(drive.randrange(width), drive.randrange(height), drive.randint(1, 40), drive.randint(1, 40))
+        assert passability.is_blocked(rect) == (rect.collidelist(blocks) != -1), rect
@@ -0,0 +1,59 @@
+from simulation import Simulation
+import level_generation as level
+
+SEED = 1234
+
+
+def get_next_door(sim):
+    """
+    Returns the lowest door of the current room leading to an unvisited room, or its lowest door if there is none.
+    """
+    doors = sorted(key for key, bridge in sim.loc.bridges.items() if isinstance(bridge, level.BridgeNode))
+    unvisited = [key for key in doors if sim.loc.bridges[key].get_node().num not in sim.visited]
+    return unvisited[0] if unvisited else doors[0]
+
+
+def explore(pregenerate, steps=40, seed=SEED):
+    """
+    Walks a new run through the given number of doors and returns the numbering seen in each room,
+    with every pregenerated room finished before the walk goes on, or none of them used.
+    """
+    sim = Simulation()
+    sim.reset(seed)
+    sim.start()
+    rooms = []
+    for i in range(steps):
+        sim.update()
+        if pregenerate:
+            for context, future in list(sim.pregenerator.pending.values()):
+                future.result()
+        else:
+            sim.pregenerator.cancel()
+        sim.traverse(get_next_door(sim))
+        rooms.append((sim.loc.num, sorted(sim.loc.bridges), sim.door_count.n, sim.room_count.n))
+    sim.pregenerator.cancel()
+    return rooms, sim.pregenerator.hits
+
+
+def test_generation_is_seeded():
+    assert explore(False)[0] == explore(False)[0]
+    assert explore(False, seed=SEED + 1)[0] != explore(False)[0]
+
+
+def test_pregeneration_keeps_numbering():
+    pregenerated, hits = explore(True)
+    generated, misses = explore(False)
+    assert hits > 0
+    assert pregenerated == generated
+
+
+def test_discarded_generation_uses_no_numbers():
+    sim = Simulation()
+    sim.reset(SEED)
+    sim.start()
+    counts = sim.door_count.n, sim.room_count.n
+    node = sim.loc.bridges[0].get_node()
+    context = level.GenerationContext(sim, sim.depth + 1, node.seed)
+    level.generate_detached_maps(context, node)
+    assert (sim.door_count.n, sim.room_count.n) == counts
+    assert context.door_count.n > counts[0] and context.room_count.n > counts[1]
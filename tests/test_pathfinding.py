@@ -0,0 +1,50 @@
+from collision import PassabilityGrid
+from pathfinding import FlowField
+from room_grid import RoomGrid
+from config import *
+
+
+class Room:
+    """
+    Stands in for a map node holding the given grid.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+
+    def get_data(self):
+        return self.grid
+
+
+def get_field():
+    """
+    Returns a flow field over a 5 by 5 room split by a wall with a gap at the bottom.
+    """
+    grid = RoomGrid(7, 7, border=1)
+    for row in range(1, 5):
+        grid.set(row, 3, 'B')
+    return FlowField(PassabilityGrid(Room(grid)))
+
+
+def test_distances_go_around_walls():
+    field = get_field()
+    field.build((1, 1))
+    assert field.get_distance(1, 1) == 0
+    assert field.get_distance(5, 1) == 4
+    assert field.get_distance(5, 3) == 6
+    assert field.get_distance(1, 5) == 12
+    assert field.get_distance(2, 3) == -1   # Wall
+    assert field.get_distance(0, 0) == -1   # Border
+    assert field.builds == 1
+
+
+def test_steps_lead_to_target():
+    field = get_field()
+    tile, target = (1, 5), (1, 1)
+    for i in range(12):
+        steps = field.get_steps(tile, target)
+        assert steps
+        dx, dy = DIRECTION_VECTORS[steps[0]]
+        tile = tile[0] + dy, tile[1] + dx
+    assert tile == target
+    assert field.get_steps(tile, target) == []
+    assert field.builds == 1    # Built once for the target, then reused
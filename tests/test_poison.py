@@ -0,0 +1,35 @@
+from poison import PoisonField
+from config import *
+
+
+def tile(row, col):
+    """
+    Returns the rect covering exactly the given tile.
+    """
+    return pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+
+def test_poison_expires_in_order():
+    poison = PoisonField()
+    poison.spread(tile(3, 3), 0)
+    poison.spread(tile(3, 4), 1000)
+    poison.spread(tile(3, 3), 2000)     # Already poisoned, keeps its first expiry
+    assert poison.is_poisoned(tile(3, 3)) and poison.is_poisoned(tile(3, 4))
+
+    poison.expire(POISON_TIME)
+    assert poison.is_poisoned(tile(3, 3))
+    poison.expire(POISON_TIME + 1)
+    assert not poison.is_poisoned(tile(3, 3)) and poison.is_poisoned(tile(3, 4))
+    poison.expire(POISON_TIME + 1001)
+    assert poison.tiles == {} and poison.expirations == []
+
+
+def test_poison_spread_again_after_expiry():
+    poison = PoisonField()
+    poison.spread(tile(5, 5), 0)
+    poison.expire(POISON_TIME + 1)
+    poison.spread(tile(5, 5), POISON_TIME + 1)
+    poison.expire(POISON_TIME + 2)
+    assert poison.is_poisoned(tile(5, 5))
+    assert poison.is_poisoned(pygame.Rect(5 * TILE_SIZE - 4, 5 * TILE_SIZE - 4, 8, 8))    # Straddles its corner
+    assert not poison.is_poisoned(tile(5, 6))
@@ -0,0 +1,179 @@
+import random as rd
+import pytest
+from replay import *
+from pathfinding import FlowField
+
+SEED = 3
+
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    """
+    Records a headless run of wandering input and returns the path of its log.
+    """
+    path = str(tmp_path_factory.mktemp('logs') / 'run.hsky')
+    drive = rd.Random(SEED)
+    sim = Simulation()
+    sim.total_lives = 3
+    sim.reset(SEED)
+    sim.recorder = Recorder(sim)
+    sim.start()
+    sim.playing = True
+    held = set()
+    while sim.playing and len(sim.recorder.log) < 15000:
+        if drive.random() < 0.05:
+            held = {drive.choice((UP, DOWN, LEFT, RIGHT))}
+        sim.held = held
+        sim.actions = [action for action in ACTIONS if drive.random() < 0.02]
+        sim.step()
+    sim.recorder.save(path, sim)
+    sim.pregenerator.cancel()
+    return path
+
+
+@pytest.fixture
+def shopping(tmp_path):
+    """
+    Records a headless run that walks to the shopkeeper in the home room, buys a power up and waits,
+    and returns its log.
+    """
+    sim = Simulation()
+    sim.fruit_count = {i: 30 for i in range(10)}
+    sim.reset(SEED)
+    sim.recorder = Recorder(sim)
+    sim.start()
+    sim.playing = True
+    shop = next((row, col) for row, col, tile in sim.loc.get_data().cells() if tile == 'S')
+    counter = shop[0] + 1, shop[1]
+    field = FlowField(sim.passability)
+    bought = False
+    while sim.playing and len(sim.recorder.log) < 600:
+        player = sim.player
+        tile = (player.y + player.y_change) // 32, (player.x + player.x_change) // 32
+        sim.held = set()
+        if not bought:
+            if tile != counter:
+                sim.held = {field.get_steps(tile, counter)[0]}
+            elif player.facing != UP:
+                sim.held = {UP}
+            elif player.movement_start == player.movement_end:
+                sim.actions = [INTERACT]
+                sim.purchases = [(0, 25, 7)]
+                bought = True
+        sim.step()
+    assert sim.power_up == 7
+    path = tmp_path / 'shop.hsky'
+    sim.recorder.save(path, sim)
+    sim.pregenerator.cancel()
+    return InputLog.load(path)
+
+
+class Clock:
+    """
+    Stands in for the frame clock, so realtime playback runs as fast as it can.
+    """
+    def tick(self, fps=0):
+        return 0
+
+
+def test_realtime_replay_makes_purchases(shopping, monkeypatch):
+    from game import Game, GameShop
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    monkeypatch.setenv('SDL_AUDIODRIVER', 'dummy')
+    monkeypatch.setattr(pygame.time, 'delay', lambda ms: None)
+    monkeypatch.setattr(Game, 'intro_text', Simulation.intro_text)
+    monkeypatch.setattr(GameShop, 'menu', lambda shop: pytest.fail('replay opened the shop menu'))
+    assert shopping.purchases
+    game = Game()
+    game.clock = Clock()
+    try:
+        assert replay(shopping, game, realtime=True) == len(shopping)
+        assert summarize(game) == tuple(shopping.summary)
+    finally:
+        game.pregenerator.cancel()
+        game.prefetcher.close()
+        game.backgrounds.close()
+        pygame.display.quit()
+
+
+def test_log_round_trip(tmp_path):
+    sim = Simulation()
+    sim.reset(SEED)
+    sim.start()
+    log = InputLog(SEED, TICK_MS, 4, {i: i for i in range(10)})
+    log.add_room(sim)
+    log.add_keyframe(sim)
+    log.add({UP, LEFT}, [INTERACT])
+    log.add(set(), [])
+    log.add_purchase(6, 2, 3)
+    log.add({DOWN}, [INTERACT, USE_POWER])
+    log.summary = summarize(sim)
+    sim.pregenerator.cancel()
+    log.save(tmp_path / 'log.hsky')
+
+    loaded = InputLog.load(tmp_path / 'log.hsky')
+    assert (loaded.seed, loaded.tick_ms, loaded.total_lives, loaded.fruit_count) == (SEED, TICK_MS, 4, list(range(10)))
+    assert loaded.inputs == log.inputs
+    assert loaded.get_input(0) == ({UP, LEFT}, [INTERACT])
+    assert loaded.get_input(2) == ({DOWN}, [INTERACT, USE_POWER])
+    assert loaded.get_purchases(1) == [(6, 2, 3)]
+    assert loaded.rooms == log.rooms
+    assert loaded.keyframes == log.keyframes
+    assert tuple(loaded.summary) == log.summary
+
+
+def test_replay_matches_recording(recording):
+    log = InputLog.load(recording)
+    sim = Simulation()
+    assert replay(log, sim) == len(log)
+    sim.pregenerator.cancel()
+    assert summarize(sim) == tuple(log.summary)
+    assert sim.depth > 0
+
+
+def test_digest_covers_numbering(recording):
+    sim = Simulation()
+    replay(InputLog.load(recording), sim)
+    sim.pregenerator.cancel()
+    digest = get_digest(sim)
+    assert get_digest(sim) == digest
+    next(sim.door_count)
+    assert get_digest(sim) != digest
+
+
+def get_numbering(sim):
+    """
+    Returns the room the simulation is in, the state of its numbering and the digest of its world.
+    """
+    return sim.loc.get_num(), sim.door_count.n, sim.room_count.n, get_digest(sim)
+
+
+def test_seek_matches_full_replay(recording):
+    log = InputLog.load(recording)
+    assert len(log.keyframes) > 2
+    unkeyed = InputLog.load(recording)
+    unkeyed.keyframes = []
+    ticks = {tick for tick, depth, room, state in log.keyframes} | {tick for tick, depth, room in log.rooms}
+    ticks = sorted(ticks | {len(log) // 3, len(log) - 1})
+    for tick in ticks:
+        sim, full = Simulation(), Simulation()
+        seek(log, sim, tick)
+        seek(unkeyed, full, tick)
+        sim.pregenerator.cancel()
+        full.pregenerator.cancel()
+        assert get_numbering(sim) == get_numbering(full), tick
+
+
+def test_rooms_are_marked_where_entered(recording):
+    log = InputLog.load(recording)
+    assert len(log.rooms) > len(log.keyframes)
+    for tick, depth, room in log.rooms:
+        sim = Simulation()
+        seek(log, sim, tick)
+        sim.pregenerator.cancel()
+        assert (sim.depth, sim.loc.get_num()) == (depth, room)
+
+
+def test_keyframes_are_taken_on_the_interval(recording):
+    log = InputLog.load(recording)
+    assert [tick for tick, depth, room, state in log.keyframes] == list(range(0, len(log), KEYFRAME_INTERVAL))
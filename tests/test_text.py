@@ -0,0 +1,36 @@
+import pytest
+from text import TextRenderer
+from config import *
+
+STRINGS = ['GAME OVER', 'PRESS Z TO START', 'PREGEN HITS 12', 'ASSET LOADS 31 (42 MS)', '"It seems you\'ve washed']
+
+
+@pytest.fixture(scope='module', params=[TITLE_FONT, TITLE_MENU_FONT, SMALL_FONT])
+def font(request):
+    pygame.font.init()
+    return pygame.font.Font(*request.param)
+
+
+def test_atlas_matches_font_render(font):
+    text = TextRenderer(font)
+    for string in STRINGS:
+        for color in ('white', 'RED', (10, 200, 30)):
+            surface, expected = text.render(string, color), font.render(string, True, color)
+            assert surface.get_size() == expected.get_size()
+            assert pygame.image.tobytes(surface, 'RGBA') == pygame.image.tobytes(expected, 'RGBA'), (string, color)
+
+
+def test_strings_are_cached(font):
+    text = TextRenderer(font, capacity=2)
+    first = text.render('ONE', 'white')
+    assert text.render('ONE', 'white') is first
+    text.render('TWO', 'white')
+    text.render('THREE', 'white')
+    assert text.render('ONE', 'white') is not first     # Least recently used, dropped
+    assert (text.hits, text.misses) == (1, 4)
+
+
+def test_glyphs_outside_atlas_use_font(font):
+    text = TextRenderer(font)
+    surface = text.render('CAFÉ', 'white')
+    assert pygame.image.tobytes(surface, 'RGBA') == pygame.image.tobytes(font.render('CAFÉ', True, 'white'), 'RGBA')
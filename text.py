@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from config import *
+
+GLYPHS = ''.join(chr(code) for code in range(32, 127))     # Printable ASCII
+
+
+class TextRenderer:
+    """
+    Draws text in a monospace font from glyph atlases rendered once per color,
+    keeping the most recently drawn strings ready to blit.
+    """
+    def __init__(self, font, capacity=TEXT_CACHE_SIZE):
+        self.font = font
+        self.capacity = capacity
+        self.advance = font.size(GLYPHS[33])[0]     # Every glyph is as wide as any other
+        self.atlases = {}                           # Color -> glyph atlas
+        self.strings = OrderedDict()                # (text, color) -> rendered string, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def get_atlas(self, color):
+        """
+        Returns the glyph atlas for the given color, rendering it on first use.
+        """
+        if color not in self.atlases:   # Rendered as one string so every glyph shares the same baseline
+            self.atlases[color] = self.font.render(GLYPHS, True, color)
+        return self.atlases[color]
+
+    def render(self, text, color):
+        """
+        Returns a surface with the given text drawn on it.
+        """
+        key = (text, color)
+        if key in self.strings:
+            self.hits += 1
+            self.strings.move_to_end(key)
+            return self.strings[key]
+
+        self.misses += 1
+        if all(glyph in GLYPHS for glyph in text):
+            atlas = self.get_atlas(tuple(pygame.Color(color)))
+            height = atlas.get_height()
+            surface = pygame.Surface(self.font.size(text), pygame.SRCALPHA)
+            surface.blits([(atlas, (i * self.advance, 0), (GLYPHS.index(glyph) * self.advance, 0, self.advance, height),
+                            pygame.BLEND_RGBA_MAX) for i, glyph in enumerate(text)], doreturn=False)
+        else:   # Glyph missing from the atlas; let the font draw the whole string
+            surface = self.font.render(text, True, color)
+        self.strings[key] = surface
+        if len(self.strings) > self.capacity:
+            self.strings.popitem(last=False)
+        return surface
+
+    def blit(self, screen, text, color, pos, center=True):
+        """
+        Draws text to the screen, centered on the given position unless told otherwise.
+        """
+        surface = self.render(text, color)
+        if center:
+            screen.blit(surface, surface.get_rect(center=pos))
+        else:
+            screen.blit(surface, pos)
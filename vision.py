@@ -0,0 +1,36 @@
+from config import *
+
+
+class VisionTable:
+    """
+    Table of the tiles visible from each tile of a room in each facing, looking a few
+    tiles straight ahead and stopping at the first wall. Rows are cast on first use and
+    kept for the life of the room, since its walls never change.
+    """
+    def __init__(self, grid, sight=SIGHT_RANGE):
+        self.grid = grid
+        self.sight = sight
+        self.table = {}     # (tile, facing) -> visible tile -> distance in tiles
+
+    def get_visible(self, tile, facing):
+        """
+        Returns the visible tiles from the given tile and facing, mapped to their distance.
+        """
+        key = (tile, facing)
+        if key not in self.table:
+            self.table[key] = self.cast(tile, facing)
+        return self.table[key]
+
+    def cast(self, tile, facing):
+        """
+        Walks the grid from the given tile in the facing direction until sight runs out or a wall blocks it.
+        """
+        dx, dy = DIRECTION_VECTORS[facing]
+        row, col = tile
+        visible = {}
+        for distance in range(1, self.sight + 1):
+            row, col = row + dy, col + dx
+            if not self.grid.is_walkable(row, col):
+                break
+            visible[(row, col)] = distance
+        return visible